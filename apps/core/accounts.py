@@ -0,0 +1,203 @@
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .cache_versions import bump_version, get_version
+from .metrics import cache_lookup
+from .models import Address
+
+UserModel = get_user_model()
+
+
+# ---------------------------------------------------------------
+# Cached auth backend
+# ---------------------------------------------------------------
+# AuthenticationMiddleware har request pe user row load karta hai. Ye backend
+# user ka ek chhota snapshot (concrete fields, password ke bina) aur uska
+# session auth hash cache mein rakhta hai. Django ka session hash check
+# snapshot ke stored hash se hota hai; password field deferred rehta hai
+# (zarurat pade toh DB se aata hai). User save / password change pe snapshot
+# delete ho jaata hai, isliye doosre sessions agle request pe logout ho jaate
+# hain jaise pehle hote the.
+#
+# QuerySet.update() signal nahi bhejta — e.g. update(is_active=False) ke baad
+# user ACCOUNT_CACHE_TIMEOUT (default 60s) tak logged in reh sakta hai.
+# Turant chahiye toh invalidate_user(user_id) bhi call karo.
+
+PERMS_VERSION_KEY = 'auth:perms:version'
+# Shared cache mein password hash kabhi nahi jaata
+SNAPSHOT_EXCLUDE = {'password'}
+
+
+def account_cache_timeout():
+    # 0 = caching band (e.g. per-process locmem cache with multiple workers)
+    return getattr(settings, 'ACCOUNT_CACHE_TIMEOUT', 60)
+
+
+def user_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def snapshot(user):
+    fields = {
+        field.attname: getattr(user, field.attname)
+        for field in UserModel._meta.concrete_fields if field.attname not in SNAPSHOT_EXCLUDE
+    }
+    return {'fields': fields, 'auth_hash': user.get_session_auth_hash()}
+
+
+def snapshot_auth_hash(user):
+    # set_password() ya deferred load ke baad password maujood hai — asli hash do
+    if 'password' in user.__dict__:
+        return UserModel.get_session_auth_hash(user)
+    return user._snapshot_auth_hash
+
+
+def from_snapshot(data):
+    fields = data['fields']
+    names = list(fields)
+    # Missing fields (password) deferred rehte hain
+    user = UserModel.from_db('default', names, [fields[name] for name in names])
+    user._snapshot_auth_hash = data['auth_hash']
+    user.get_session_auth_hash = partial(snapshot_auth_hash, user)
+    return user
+
+
+def perms_version():
+    return get_version(PERMS_VERSION_KEY)
+
+
+def perms_key(user_id):
+    return f'auth:perms:{perms_version()}:{user_id}'
+
+
+def invalidate_user(user_id):
+    cache.delete_many([user_key(user_id), perms_key(user_id)])
+
+
+def invalidate_perms():
+    # Group ki permissions badli toh kaunse users affected hain pata nahi — sab ka version bump
+    bump_version(PERMS_VERSION_KEY)
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend jaisa hi, bas get_user() aur get_all_permissions()
+    cache se serve hote hain. authenticate() bilkul same hai.
+    """
+
+    def get_user(self, user_id):
+        timeout = account_cache_timeout()
+        if not timeout:
+            return super().get_user(user_id)
+
+        data = cache.get(user_key(user_id))
+        cache_lookup('user', data is not None)
+        if data is not None:
+            user = from_snapshot(data)
+        else:
+            try:
+                user = UserModel._default_manager.get(pk=user_id)
+            except UserModel.DoesNotExist:
+                return None
+            cache.set(user_key(user_id), snapshot(user), timeout)
+        return user if self.user_can_authenticate(user) else None
+
+    async def aget_user(self, user_id):
+        timeout = account_cache_timeout()
+        if not timeout:
+            return await super().aget_user(user_id)
+
+        data = await cache.aget(user_key(user_id))
+        cache_lookup('user', data is not None)
+        if data is not None:
+            user = from_snapshot(data)
+        else:
+            try:
+                user = await UserModel._default_manager.aget(pk=user_id)
+            except UserModel.DoesNotExist:
+                return None
+            await cache.aset(user_key(user_id), snapshot(user), timeout)
+        return user if self.user_can_authenticate(user) else None
+
+    def get_all_permissions(self, user_obj, obj=None):
+        timeout = account_cache_timeout()
+        if not timeout or not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return super().get_all_permissions(user_obj, obj=obj)
+        if not hasattr(user_obj, '_perm_cache'):
+            key = perms_key(user_obj.pk)
+            perms = cache.get(key)
+            cache_lookup('perms', perms is not None)
+            if perms is None:
+                perms = super().get_all_permissions(user_obj)
+                cache.set(key, perms, timeout)
+            user_obj._perm_cache = perms
+        return user_obj._perm_cache
+
+
+@receiver(post_save, sender=UserModel)
+@receiver(post_delete, sender=UserModel)
+def user_changed(sender, instance, **kwargs):
+    # Login pe last_login save hota hai — woh bhi yahin se snapshot refresh karta hai
+    invalidate_user(instance.pk)
+
+
+@receiver(m2m_changed, sender=UserModel.groups.through)
+@receiver(m2m_changed, sender=UserModel.user_permissions.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def permissions_changed(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_perms()
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, **kwargs):
+    invalidate_perms()
+
+
+# ---------------------------------------------------------------
+# Address book
+# ---------------------------------------------------------------
+# Cart page aur place_order dono user ke addresses padhte hain. Poori list
+# (Address.Meta.ordering mein — default pehle) per-user cache hoti hai;
+# Address save/delete aur make_default() pe delete.
+
+def address_book_key(user_id):
+    return f'addresses:{user_id}'
+
+
+def invalidate_address_book(user_id):
+    cache.delete(address_book_key(user_id))
+
+
+async def aget_address_book(user_id):
+    timeout = account_cache_timeout()
+    if not timeout:
+        return [address async for address in Address.objects.filter(user_id=user_id)]
+    addresses = await cache.aget(address_book_key(user_id))
+    cache_lookup('addresses', addresses is not None)
+    if addresses is None:
+        addresses = [address async for address in Address.objects.filter(user_id=user_id)]
+        await cache.aset(address_book_key(user_id), addresses, timeout)
+    return addresses
+
+
+async def aget_address(user_id, address_id):
+    """User ka ek address address book se. Na mile toh Address.DoesNotExist."""
+    for address in await aget_address_book(user_id):
+        if str(address.pk) == str(address_id):
+            return address
+    raise Address.DoesNotExist('Address matching query does not exist.')
+
+
+@receiver(post_save, sender=Address)
+@receiver(post_delete, sender=Address)
+def address_changed(sender, instance, **kwargs):
+    invalidate_address_book(instance.user_id)
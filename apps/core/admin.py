@@ -1,15 +1,153 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.db.models import Count
 from django.utils.html import format_html
 from django.conf import settings
-from .models import HomeHero, Product, Address, Order, OrderItem, Coupon
+from .dispatch import TRANSITIONS, route_sheet_response, transition_orders
+from .models import (
+    HomeHero, Product, Address, Order, OrderItem, Coupon, Subscription,
+    DispatchManifest, OrderStatusHistory, ArchivedOrder, ArchivedOrderItem, Review,
+)
+from .catalog import invalidate_catalog
+from .reviews import apply_delta
 
 admin.site.register(HomeHero)
-admin.site.register(Product)
 admin.site.register(Address)
-admin.site.register(Order)
 admin.site.register(OrderItem)
 
 
+@admin.register(Product)
+class ProductAdmin(admin.ModelAdmin):
+    list_display = ['name', 'sku', 'price', 'unit', 'rating', 'reviews_count']
+    search_fields = ['name', 'sku']
+    # Review aggregates core.reviews maintain karta hai
+    readonly_fields = [
+        'rating', 'reviews_count', 'rating_sum',
+        'rating_1_count', 'rating_2_count', 'rating_3_count', 'rating_4_count', 'rating_5_count',
+    ]
+
+
+@admin.register(Review)
+class ReviewAdmin(admin.ModelAdmin):
+    list_display = ['product', 'user', 'rating', 'created_at']
+    list_filter = ['rating']
+    search_fields = ['product__name', 'user__username', 'comment']
+    list_select_related = ['product', 'user']
+    readonly_fields = ['user', 'product', 'order_item', 'archived_order_item', 'rating', 'created_at', 'updated_at']
+
+    def has_add_permission(self, request):
+        return False
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        apply_delta(obj.product_id, count=-1, total=-obj.rating, remove=obj.rating)
+        invalidate_catalog()
+
+    def delete_queryset(self, request, queryset):
+        for review in queryset:
+            self.delete_model(request, review)
+
+
+# --- Dispatch: bulk status actions ---
+def status_action(to_status, orders_of=lambda queryset: queryset):
+    def action(modeladmin, request, queryset):
+        try:
+            updated = transition_orders(orders_of(queryset), to_status, user=request.user)
+        except ValueError as e:
+            modeladmin.message_user(request, str(e), messages.ERROR)
+            return
+        modeladmin.message_user(request, f"{updated} orders moved to '{to_status}'.")
+    action.__name__ = f"mark_{to_status.lower().replace(' ', '_')}"
+    action.short_description = f"Mark as {to_status}"
+    return action
+
+
+class OrderStatusHistoryInline(admin.TabularInline):
+    model = OrderStatusHistory
+    extra = 0
+    can_delete = False
+    readonly_fields = ['from_status', 'to_status', 'changed_by', 'changed_at']
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+class OrderAdminForm(forms.ModelForm):
+    # Status seedha edit nahi hota — sirf TRANSITIONS wale agle status, transition_orders ke through
+    change_status = forms.ChoiceField(required=False, label="Move to status")
+
+    class Meta:
+        model = Order
+        fields = '__all__'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        targets = TRANSITIONS.get(self.instance.status, ()) if self.instance.pk else ()
+        self.fields['change_status'].choices = [('', '---------')] + [(status, status) for status in targets]
+
+
+@admin.register(Order)
+class OrderAdmin(admin.ModelAdmin):
+    form = OrderAdminForm
+    list_display = ['id', 'user', 'status', 'total_amount', 'delivery_date', 'manifest', 'created_at']
+    list_filter = ['status', 'delivery_date']
+    list_select_related = ['user', 'manifest']
+    raw_id_fields = ['user', 'shipping_address', 'coupon', 'manifest']
+    readonly_fields = ['status']
+    inlines = [OrderStatusHistoryInline]
+    actions = [
+        status_action('Processing'),
+        status_action('Out for Delivery'),
+        status_action('Delivered'),
+        status_action('Cancelled'),
+    ]
+
+    def save_model(self, request, obj, form, change):
+        if change:
+            # status chhod ke baaki fields — beech mein hua transition overwrite na ho
+            obj.save(update_fields=[
+                field.name for field in Order._meta.concrete_fields
+                if not field.primary_key and field.name not in ('status', 'created_at')
+            ])
+        else:
+            obj.save()
+
+        to_status = form.cleaned_data.get('change_status')
+        if to_status:
+            updated = transition_orders(Order.objects.filter(pk=obj.pk), to_status, user=request.user)
+            if not updated:
+                self.message_user(request, f"Order status changed meanwhile; not moved to '{to_status}'.", messages.WARNING)
+            obj.refresh_from_db(fields=['status', 'updated_at'])
+
+
+def manifest_orders(queryset):
+    return Order.objects.filter(manifest__in=queryset)
+
+
+@admin.register(DispatchManifest)
+class DispatchManifestAdmin(admin.ModelAdmin):
+    list_display = ['delivery_date', 'slot', 'pincode', 'order_count']
+    list_filter = ['delivery_date', 'slot']
+    search_fields = ['pincode']
+    actions = [
+        status_action('Processing', manifest_orders),
+        status_action('Out for Delivery', manifest_orders),
+        status_action('Delivered', manifest_orders),
+        'export_route_sheet',
+    ]
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(order_count=Count('orders'))
+
+    def order_count(self, obj):
+        return obj.order_count
+    order_count.admin_order_field = 'order_count'
+
+    def export_route_sheet(self, request, queryset):
+        return route_sheet_response(queryset)
+    export_route_sheet.short_description = 'Export route sheet (CSV)'
+
+
 @admin.register(Coupon)
 class CouponAdmin(admin.ModelAdmin):
     list_display = [
@@ -131,4 +269,44 @@ class CouponAdmin(admin.ModelAdmin):
         )
 
     promo_url_display.short_description = 'Promo URL (Copy & Share)'
-    promo_url_display.allow_tags = True 
\ No newline at end of file
+    promo_url_display.allow_tags = True 
+
+
+@admin.register(Subscription)
+class SubscriptionAdmin(admin.ModelAdmin):
+    list_display = ['user', 'product', 'quantity', 'schedule', 'is_active', 'start_date', 'end_date', 'last_generated_for']
+    list_filter = ['is_active', 'schedule']
+    search_fields = ['user__username', 'product__name']
+    raw_id_fields = ['user', 'shipping_address']
+    readonly_fields = ['last_generated_for']
+
+
+
+# --- Archive (read-only) ---
+class ReadOnlyAdmin(admin.ModelAdmin):
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+class ArchivedOrderItemInline(admin.TabularInline):
+    model = ArchivedOrderItem
+    extra = 0
+    can_delete = False
+    readonly_fields = ['product', 'price', 'quantity']
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(ReadOnlyAdmin):
+    list_display = ['id', 'user', 'status', 'total_amount', 'created_at', 'archived_at']
+    list_filter = ['status']
+    list_select_related = ['user']
+    inlines = [ArchivedOrderItemInline, OrderStatusHistoryInline]
@@ -0,0 +1,102 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Value
+from django.utils import timezone
+
+from .models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem, OrderStatusHistory, Review
+from .routers import use_primary
+
+
+# ---------------------------------------------------------------
+# Order archival
+# ---------------------------------------------------------------
+# Delivered/Cancelled orders jo ARCHIVE_AFTER_DAYS se purane hain, chhote
+# batches mein archive tables mein move hote hain. Har batch apna transaction
+# hai — beech mein ruk jaye toh dobara chalao, wahin se shuru hoga.
+
+ARCHIVE_STATUSES = ('Delivered', 'Cancelled')
+
+ORDER_FIELDS = [
+    'id', 'user_id', 'shipping_address_id', 'subtotal', 'delivery_fee', 'coupon_id',
+    'discount_amount', 'total_amount', 'status', 'delivery_date', 'created_at', 'updated_at',
+]
+ITEM_FIELDS = ['id', 'order_id', 'product_id', 'price', 'quantity']
+
+
+def order_history(**filters):
+    """
+    Live + archived orders ek saath (UNION ALL) — reporting/exports ke liye,
+    e.g. order_history(user=user). Dicts deta hai (ORDER_FIELDS + is_archived).
+    DB view nahi hai taaki Order ki aage ki migrations pe koi rok na lage.
+    """
+    # order_by() — Meta.ordering UNION ke andar allowed nahi
+    live = Order.objects.filter(**filters).order_by().values(*ORDER_FIELDS).annotate(is_archived=Value(False))
+    archived = (
+        ArchivedOrder.objects.filter(**filters).order_by()
+        .values(*ORDER_FIELDS).annotate(is_archived=Value(True))
+    )
+    return live.union(archived, all=True).order_by('-created_at')
+
+
+def archivable_orders(days=None):
+    days = days if days is not None else getattr(settings, 'ORDER_ARCHIVE_AFTER_DAYS', 180)
+    cutoff = timezone.now() - timedelta(days=days)
+    return Order.objects.filter(status__in=ARCHIVE_STATUSES, created_at__lt=cutoff)
+
+
+def archive_batch(queryset, batch_size):
+    """Ek batch move karo. Returns kitne orders archive hue (0 = kaam khatam)."""
+    # Copy bhi primary se — replica lag ho toh delete se pehle purani rows copy ho jaati
+    with use_primary(), transaction.atomic():
+        ids = list(
+            queryset.select_for_update(skip_locked=True)
+            .order_by('id').values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return 0
+
+        orders = Order.objects.filter(id__in=ids).values(*ORDER_FIELDS)
+        items = OrderItem.objects.filter(order_id__in=ids).values(*ITEM_FIELDS)
+
+        # ignore_conflicts: agar koi row pehle hi archive mein hai toh dobara na likho
+        ArchivedOrder.objects.bulk_create([ArchivedOrder(**row) for row in orders], ignore_conflicts=True)
+        ArchivedOrderItem.objects.bulk_create([ArchivedOrderItem(**row) for row in items], ignore_conflicts=True)
+
+        # Reviews archived items pe shift karo (IDs same hain) — product aggregates
+        # in reviews ko gin rahe hain, ye delete nahi hone chahiye
+        Review.objects.filter(order_item__order_id__in=ids).update(
+            archived_order_item_id=F('order_item_id'), order_item=None,
+        )
+
+        # Status audit trail bhi archived order ke saath rehta hai
+        OrderStatusHistory.objects.filter(order_id__in=ids).update(
+            archived_order_id=F('order_id'), order=None,
+        )
+
+        OrderItem.objects.filter(order_id__in=ids).delete()
+        Order.objects.filter(id__in=ids).delete()
+    return len(ids)
+
+
+def archive_orders(days=None, batch_size=1000, max_batches=None, pause=0.0, log=None):
+    """
+    Batches mein archive karo jab tak kuch bacha hai (ya max_batches tak).
+    `pause` seconds har batch ke baad — live traffic ko saans lene do.
+    """
+    total = 0
+    batches = 0
+    queryset = archivable_orders(days)
+    while max_batches is None or batches < max_batches:
+        moved = archive_batch(queryset, batch_size)
+        if not moved:
+            break
+        total += moved
+        batches += 1
+        if log:
+            log(f"  batch {batches}: {moved} orders (total {total})")
+        if pause:
+            time.sleep(pause)
+    return total
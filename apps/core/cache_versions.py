@@ -0,0 +1,26 @@
+import time
+
+from django.core.cache import cache
+
+
+# ---------------------------------------------------------------
+# Versioned cache keys
+# ---------------------------------------------------------------
+# Catalog, recommendations aur permissions ke cache keys mein ek version
+# number hota hai — invalidate karna matlab version bump, purani entries apne
+# aap expire ho jaati hain. Version key evict ho jaye toh naya version current
+# time se shuru hota hai (1 se nahi), taaki purani entry wapas na mile.
+
+def get_version(key):
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), None)
@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache_versions import bump_version, get_version
+from .metrics import cache_lookup
+from .models import Product
+
+
+# ---------------------------------------------------------------
+# Catalog cache
+# ---------------------------------------------------------------
+# Home page ki product list cache mein rehti hai, versioned key ke saath
+# (core.cache_versions) — invalidate karna matlab version bump.
+# CATALOG_CACHE_TIMEOUT = 0 pe caching band (per-worker locmem cache).
+
+CATALOG_VERSION_KEY = 'catalog:version'
+
+
+def catalog_timeout():
+    return getattr(settings, 'CATALOG_CACHE_TIMEOUT', 60 * 15)
+
+
+def catalog_version():
+    return get_version(CATALOG_VERSION_KEY)
+
+
+def invalidate_catalog():
+    bump_version(CATALOG_VERSION_KEY)
+
+
+def get_products():
+    timeout = catalog_timeout()
+    if not timeout:
+        return list(Product.objects.all())
+
+    key = f'catalog:products:{catalog_version()}'
+    products = cache.get(key)
+    cache_lookup('catalog', products is not None)
+    if products is None:
+        products = list(Product.objects.all())
+        cache.set(key, products, timeout)
+    return products
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def product_changed(sender, **kwargs):
+    invalidate_catalog()
@@ -0,0 +1,122 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+from django.utils.text import compress_sequence, compress_string
+
+try:
+    import brotli
+except ImportError:  # Brotli optional hai — na ho toh sirf gzip
+    brotli = None
+
+
+# ---------------------------------------------------------------
+# HTML response compression
+# ---------------------------------------------------------------
+# Static files WhiteNoise compress karta hai; ye middleware server-rendered
+# HTML/JSON ko Brotli (agar installed) ya gzip mein bhejta hai.
+#
+# BREACH: jis page mein CSRF token render hua (get_token() ne
+# CSRF_COOKIE_NEEDS_UPDATE set kiya), use by default compress nahi karte —
+# secret + attacker-controlled input ek hi compressed body mein na jaaye.
+# COMPRESS_CSRF_PAGES = True se override. Isliye MIDDLEWARE mein ye
+# CsrfViewMiddleware ke *baad* aata hai — CSRF ka process_response flag
+# reset kar deta hai, humein response usse pehle dekhna hai.
+
+ACCEPT_BR_RE = _lazy_re_compile(r'\bbr\b')
+ACCEPT_GZIP_RE = _lazy_re_compile(r'\bgzip\b')
+
+COMPRESSIBLE_TYPES = ('text/html', 'application/json', 'text/csv', 'text/plain')
+
+
+def brotli_sequence(sequence):
+    compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=5)
+    for item in sequence:
+        data = compressor.process(item)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def abrotli_sequence(sequence):
+    compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=5)
+    async for item in sequence:
+        data = compressor.process(item)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def agzip_sequence(sequence):
+    # Django ke GZipMiddleware jaisa — async stream mein har chunk apna gzip member
+    async for item in sequence:
+        yield compress_string(item, max_random_bytes=100)
+
+
+class CompressionMiddleware:
+    # Sync aur async dono — ASGI mein async views ke aage thread hop nahi
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        return self.compress(request, response)
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        return self.compress(request, response)
+
+    def compress(self, request, response):
+        if response.has_header('Content-Encoding') or response.status_code in (204, 304):
+            return response
+        content_type = response.get('Content-Type', '').split(';')[0].strip()
+        if content_type not in COMPRESSIBLE_TYPES:
+            return response
+        if not response.streaming and len(response.content) < getattr(settings, 'COMPRESS_MIN_SIZE', 1024):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        if request.META.get('CSRF_COOKIE_NEEDS_UPDATE') and not getattr(settings, 'COMPRESS_CSRF_PAGES', False):
+            return response
+
+        accept = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if brotli is not None and ACCEPT_BR_RE.search(accept):
+            encoding = 'br'
+        elif ACCEPT_GZIP_RE.search(accept):
+            encoding = 'gzip'
+        else:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                compressor = abrotli_sequence if encoding == 'br' else agzip_sequence
+                response.streaming_content = compressor(response.streaming_content)
+            elif encoding == 'br':
+                response.streaming_content = brotli_sequence(response.streaming_content)
+            else:
+                response.streaming_content = compress_sequence(response.streaming_content, max_random_bytes=100)
+            del response.headers['Content-Length']
+        else:
+            if encoding == 'br':
+                compressed = brotli.compress(response.content, mode=brotli.MODE_TEXT, quality=5)
+            else:
+                compressed = compress_string(response.content, max_random_bytes=100)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(response.content))
+
+        # Strong ETag compressed body pe sahi nahi rehta
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
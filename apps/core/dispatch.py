@@ -0,0 +1,144 @@
+import csv
+import itertools
+from datetime import datetime, time
+
+from django.db import transaction
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import DispatchManifest, Order, OrderItem, OrderStatusHistory
+from .routers import use_primary
+
+
+# ---------------------------------------------------------------
+# Dispatch: manifests aur bulk status transitions
+# ---------------------------------------------------------------
+
+# Kis status se kis status pe ja sakte hain
+TRANSITIONS = {
+    'Pending': ('Processing', 'Cancelled'),
+    'Processing': ('Out for Delivery', 'Cancelled'),
+    'Out for Delivery': ('Delivered',),
+}
+
+OPEN_STATUSES = ('Pending', 'Processing')
+
+BATCH_SIZE = 5000
+
+
+def allowed_from(to_status):
+    return [status for status, targets in TRANSITIONS.items() if to_status in targets]
+
+
+def build_manifests(delivery_date, slot='Morning'):
+    """
+    Us din deliver hone wale open orders ko pincode ke hisaab se manifests mein
+    daalta hai. Subscription orders delivery_date se, baaki orders jo us din se
+    pehle place hue. Returns number of orders assigned.
+    """
+    cutoff = timezone.make_aware(datetime.combine(delivery_date, time.min))
+    orders = Order.objects.filter(
+        Q(delivery_date=delivery_date) | Q(delivery_date__isnull=True, created_at__lt=cutoff),
+        status__in=OPEN_STATUSES,
+        manifest__isnull=True,
+        shipping_address__isnull=False,
+    )
+
+    pincodes = list(orders.values_list('shipping_address__pincode', flat=True).distinct())
+    assigned = 0
+    with transaction.atomic():
+        DispatchManifest.objects.bulk_create(
+            [DispatchManifest(delivery_date=delivery_date, slot=slot, pincode=pc) for pc in pincodes],
+            ignore_conflicts=True,
+        )
+        manifests = DispatchManifest.objects.filter(
+            delivery_date=delivery_date, slot=slot, pincode__in=pincodes,
+        )
+        for manifest in manifests:
+            assigned += orders.filter(shipping_address__pincode=manifest.pincode).update(manifest=manifest)
+    return assigned
+
+
+@use_primary()
+def transition_orders(orders, to_status, user=None):
+    """
+    Bulk status change — set-based update() + audit rows, BATCH_SIZE orders
+    per transaction. Jo orders allowed status mein nahi hain woh skip hote hain.
+    Returns number of orders updated.
+    """
+    sources = allowed_from(to_status)
+    if not sources:
+        raise ValueError(f"Cannot move orders to '{to_status}'.")
+
+    ids = list(orders.filter(status__in=sources).values_list('id', flat=True))
+    updated = 0
+    for start in range(0, len(ids), BATCH_SIZE):
+        batch = ids[start:start + BATCH_SIZE]
+        with transaction.atomic():
+            # Lock karke current status padho, taaki history sahi from_status likhe
+            current = list(
+                Order.objects.select_for_update()
+                .filter(id__in=batch, status__in=sources)
+                .values_list('id', 'status')
+            )
+            if not current:
+                continue
+            Order.objects.filter(id__in=[pk for pk, _ in current]).update(
+                status=to_status, updated_at=timezone.now(),
+            )
+            OrderStatusHistory.objects.bulk_create([
+                OrderStatusHistory(order_id=pk, from_status=status, to_status=to_status, changed_by=user)
+                for pk, status in current
+            ])
+            updated += len(current)
+    return updated
+
+
+ROUTE_SHEET_HEADER = [
+    'Manifest', 'Pincode', 'Order', 'Customer', 'Phone', 'Address', 'City',
+    'Product', 'Unit', 'Quantity', 'Order Total', 'Status',
+]
+
+
+def route_sheet_rows(manifests):
+    """Route sheet ki rows — ek joined query, pincode aur order ke order mein."""
+    items = (
+        OrderItem.objects
+        .filter(order__manifest__in=manifests)
+        .order_by('order__manifest__pincode', 'order__shipping_address__street_address', 'order_id')
+        .values_list(
+            'order__manifest_id', 'order__manifest__pincode', 'order_id',
+            'order__shipping_address__full_name', 'order__shipping_address__phone_number',
+            'order__shipping_address__street_address', 'order__shipping_address__city',
+            'product__name', 'product__unit', 'quantity', 'order__total_amount', 'order__status',
+        )
+    )
+    return items.iterator(chunk_size=2000)
+
+
+# Excel/Sheets in characters se shuru hone wali cell ko formula maan lete hain —
+# customer ka naam/address "=HYPERLINK(...)" ho sakta hai. Aage ' lagao.
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def csv_safe(value):
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+class Echo:
+    """csv.writer ke liye buffer jo likha hua wapas return kar de."""
+    def write(self, value):
+        return value
+
+
+def route_sheet_response(manifests, filename='route-sheet.csv'):
+    writer = csv.writer(Echo())
+    rows = itertools.chain([ROUTE_SHEET_HEADER], route_sheet_rows(manifests))
+    response = StreamingHttpResponse(
+        (writer.writerow([csv_safe(value) for value in row]) for row in rows), content_type='text/csv',
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from core.archive import archivable_orders, archive_orders
+from core.routers import use_primary
+
+
+class Command(BaseCommand):
+    help = (
+        "Purane Delivered/Cancelled orders ko archive tables mein move karta hai, "
+        "chhote restartable batches mein."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help="Isse purane orders (default: ORDER_ARCHIVE_AFTER_DAYS)")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--max-batches', type=int, help="Itne batches ke baad ruk jao")
+        parser.add_argument('--pause', type=float, default=0.0, help="Har batch ke baad seconds")
+        parser.add_argument('--dry-run', action='store_true')
+
+    @use_primary()
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            count = archivable_orders(options['days']).count()
+            self.stdout.write(f"{count} orders would be archived.")
+            return
+
+        total = archive_orders(
+            days=options['days'],
+            batch_size=options['batch_size'],
+            max_batches=options['max_batches'],
+            pause=options['pause'],
+            log=self.stdout.write,
+        )
+        self.stdout.write(self.style.SUCCESS(f"Archived {total} orders."))
@@ -0,0 +1,76 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+
+
+class Command(BaseCommand):
+    help = (
+        "apply_coupon endpoint ko high concurrency pe hit karta hai — "
+        "WSGI style (thread per request) vs ASGI (AsyncClient), "
+        "har DB query pe simulated latency ke saath."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--db-latency-ms', type=float, default=20.0)
+
+    def handle(self, *args, **options):
+        total = options['requests']
+        concurrency = options['concurrency']
+        latency = options['db_latency_ms'] / 1000
+
+        def slow_db(execute, sql, params, many, context):
+            time.sleep(latency)
+            return execute(sql, params, many, context)
+
+        def add_latency(sender, connection, **kwargs):
+            connection.execute_wrappers.append(slow_db)
+
+        # Invalid code — sirf ek SELECT, kuch write nahi hota
+        url = reverse('apply_coupon')
+        body = json.dumps({'code': 'BENCH-DOES-NOT-EXIST', 'subtotal': 100})
+
+        connections.close_all()
+        connection_created.connect(add_latency)
+        try:
+            with override_settings(RATELIMIT_ENABLE=False):
+                wsgi = self.run_wsgi(url, body, total, concurrency)
+                connections.close_all()
+                asgi = asyncio.run(self.run_asgi(url, body, total, concurrency))
+        finally:
+            connection_created.disconnect(add_latency)
+            connections.close_all()
+
+        self.stdout.write(f"{total} requests, concurrency {concurrency}, {latency * 1000:.0f} ms per query")
+        self.stdout.write(f"WSGI ({concurrency} threads): {wsgi:.2f}s  ({total / wsgi:.0f} req/s)")
+        self.stdout.write(f"ASGI (AsyncClient):      {asgi:.2f}s  ({total / asgi:.0f} req/s)")
+
+    def run_wsgi(self, url, body, total, concurrency):
+        def one(_):
+            Client().post(url, body, content_type='application/json')
+            connections.close_all()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(one, range(total)))
+        return time.perf_counter() - start
+
+    async def run_asgi(self, url, body, total, concurrency):
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with semaphore:
+                await client.post(url, body, content_type='application/json')
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        return time.perf_counter() - start
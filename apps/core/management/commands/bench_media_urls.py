@@ -0,0 +1,52 @@
+import time
+
+from django.core.files.storage import FileSystemStorage
+from django.core.management.base import BaseCommand
+
+from core.storage import CachedURLMixin
+
+
+class FakeRemoteStorage(FileSystemStorage):
+    """Local fake: har url() pe Cloudinary SDK jitna (~100us) kaam simulate karta hai."""
+    def __init__(self, cost, **kwargs):
+        super().__init__(**kwargs)
+        self.cost = cost
+        self.calls = 0
+
+    def url(self, name):
+        self.calls += 1
+        deadline = time.perf_counter() + self.cost
+        while time.perf_counter() < deadline:
+            pass
+        return super().url(name)
+
+
+class CachedFakeRemoteStorage(CachedURLMixin, FakeRemoteStorage):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Home page jaisa render: N products ke image URLs, bina cache vs cached storage."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=200)
+        parser.add_argument('--renders', type=int, default=50)
+        parser.add_argument('--url-cost-us', type=float, default=100.0)
+
+    def handle(self, *args, **options):
+        names = [f'products/item-{i}.jpeg' for i in range(options['products'])]
+        cost = options['url_cost_us'] / 1e6
+
+        for label, storage in (
+            ('uncached', FakeRemoteStorage(cost)),
+            ('cached', CachedFakeRemoteStorage(cost)),
+        ):
+            start = time.perf_counter()
+            for _ in range(options['renders']):
+                for name in names:
+                    storage.url(name)
+            per_render = (time.perf_counter() - start) / options['renders']
+            self.stdout.write(
+                f"{label:>9}: {per_render * 1000:.2f} ms per render "
+                f"({storage.calls} backend url() calls)"
+            )
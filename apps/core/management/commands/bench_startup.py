@@ -0,0 +1,78 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+# Child process mein chalta hai: fresh interpreter, koi import cache nahi
+CHILD = """
+import json, os, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+booted = time.perf_counter()
+from django.test import Client
+client = Client()
+response = client.get(sys.argv[1])
+first = time.perf_counter()
+client.get(sys.argv[1])
+second = time.perf_counter()
+print(json.dumps({
+    'status': response.status_code,
+    'startup': booted - start,
+    'first': first - booted,
+    'second': second - first,
+    'middleware': len(__import__('django.conf').conf.settings.MIDDLEWARE),
+    'apps': len(__import__('django.conf').conf.settings.INSTALLED_APPS),
+}))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Har settings module ke liye cold-start (django.setup + URLconf) aur "
+        "first-request latency naapta hai, fresh process mein."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'modules', nargs='*',
+            default=['config.settings.local', 'config.settings.production'],
+        )
+        parser.add_argument('--path', default='/admin/login/', help="First request ka URL")
+        parser.add_argument('--runs', type=int, default=3)
+
+    def handle(self, *args, **options):
+        env = dict(os.environ)
+        # Production profile ko local chalane ke liye minimum env
+        env.setdefault('SECRET_KEY', 'bench-only')
+        env.setdefault('DATABASE_URL', f"sqlite:///{settings.BASE_DIR / 'db.sqlite3'}")
+
+        for module in options['modules']:
+            env['DJANGO_SETTINGS_MODULE'] = module
+            results = []
+            for _ in range(options['runs']):
+                proc = subprocess.run(
+                    [sys.executable, '-c', CHILD, options['path']],
+                    env=env, cwd=settings.BASE_DIR, capture_output=True, text=True,
+                )
+                if proc.returncode != 0:
+                    self.stderr.write(f"{module} failed:\n{proc.stderr.strip()}")
+                    break
+                results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+            if not results:
+                continue
+
+            best = {key: min(r[key] for r in results) for key in ('startup', 'first', 'second')}
+            self.stdout.write(
+                f"{module}: {results[0]['apps']} apps, {results[0]['middleware']} middleware, "
+                f"startup {best['startup'] * 1000:.0f} ms, "
+                f"first request {best['first'] * 1000:.1f} ms, "
+                f"warm request {best['second'] * 1000:.1f} ms "
+                f"(HTTP {results[0]['status']}, best of {len(results)})"
+            )
@@ -0,0 +1,31 @@
+from datetime import date as date_cls
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.dispatch import build_manifests
+from core.models import DispatchManifest
+from core.routers import use_primary
+
+
+class Command(BaseCommand):
+    help = "Open orders ko delivery date + slot ke pincode-wise manifests mein group karta hai."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help="Delivery date (YYYY-MM-DD). Default: aaj")
+        parser.add_argument('--slot', default='Morning', choices=[c for c, _ in DispatchManifest.SLOT_CHOICES])
+
+    @use_primary()
+    def handle(self, *args, **options):
+        if options['date']:
+            try:
+                delivery_date = date_cls.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError("--date must be YYYY-MM-DD.")
+        else:
+            delivery_date = timezone.localdate()
+
+        assigned = build_manifests(delivery_date, options['slot'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Assigned {assigned} orders to {options['slot']} manifests for {delivery_date}."
+        ))
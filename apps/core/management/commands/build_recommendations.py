@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from core.recommendations import build_recommendations
+from core.routers import use_primary
+
+
+class Command(BaseCommand):
+    help = (
+        "Order history se 'Frequently bought together' index banata hai. "
+        "Default incremental (sirf naye orders); --full se shuru se."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000, help="Orders per chunk")
+        parser.add_argument('--top-k', type=int, default=8)
+        parser.add_argument('--full', action='store_true', help="Pairs delete karke poora rebuild")
+        parser.add_argument(
+            '--settle-seconds', type=int, default=None,
+            help="Itne seconds se naye orders skip (default RECOMMENDATIONS_SETTLE_SECONDS)",
+        )
+
+    @use_primary()
+    def handle(self, *args, **options):
+        processed, updated = build_recommendations(
+            chunk_size=options['chunk_size'],
+            top_k=options['top_k'],
+            full=options['full'],
+            settle_seconds=options['settle_seconds'],
+            log=self.stdout.write,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {processed} orders, refreshed neighbors for {updated} products."
+        ))
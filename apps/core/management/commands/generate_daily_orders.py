@@ -0,0 +1,124 @@
+from collections import defaultdict
+from datetime import date as date_cls, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import Order, OrderItem, Product, Subscription, schedule_matches
+from core.routers import use_primary
+
+
+FREE_DELIVERY_MIN = Decimal('500.00')
+DELIVERY_FEE = Decimal('40.00')
+
+
+def pending_for(delivery_date):
+    return Q(last_generated_for__isnull=True) | Q(last_generated_for__lt=delivery_date)
+
+
+class Command(BaseCommand):
+    help = (
+        "Active subscriptions se ek delivery date ke orders banata hai. "
+        "Ek user + address ki saari subscriptions ek order mein jaati hain. "
+        "Dobara chalane pe sirf bache hue subscriptions process hote hain."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help="Delivery date (YYYY-MM-DD). Default: kal")
+        parser.add_argument('--chunk-size', type=int, default=2000, help="Orders per transaction")
+        parser.add_argument('--dry-run', action='store_true')
+
+    @use_primary()
+    def handle(self, *args, **options):
+        if options['date']:
+            try:
+                delivery_date = date_cls.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError("--date must be YYYY-MM-DD.")
+        else:
+            delivery_date = timezone.localdate() + timedelta(days=1)
+
+        # Set-based: ek query mein saare pending subscriptions, sirf zaroori columns
+        rows = (
+            Subscription.objects
+            .filter(is_active=True, start_date__lte=delivery_date)
+            .filter(Q(end_date__isnull=True) | Q(end_date__gte=delivery_date))
+            .filter(pending_for(delivery_date))
+            .values_list('id', 'user_id', 'shipping_address_id', 'product_id', 'quantity',
+                         'schedule', 'start_date')
+            .order_by('user_id', 'shipping_address_id', 'id')
+        )
+
+        groups = defaultdict(list)
+        for sub_id, user_id, address_id, product_id, qty, schedule, start_date in rows.iterator(chunk_size=5000):
+            if schedule_matches(schedule, start_date, delivery_date):
+                groups[(user_id, address_id)].append((sub_id, product_id, qty))
+
+        prices = dict(Product.objects.values_list('id', 'price'))
+
+        self.stdout.write(
+            f"{delivery_date}: {sum(len(g) for g in groups.values())} subscriptions "
+            f"-> {len(groups)} orders."
+        )
+        if options['dry_run'] or not groups:
+            return
+
+        keys = list(groups)
+        chunk_size = options['chunk_size']
+        created = 0
+        for start in range(0, len(keys), chunk_size):
+            chunk = {key: groups[key] for key in keys[start:start + chunk_size]}
+            created += self.create_orders(chunk, prices, delivery_date)
+            self.stdout.write(f"  {created}/{len(keys)} orders")
+
+        self.stdout.write(self.style.SUCCESS(f"Created {created} orders for {delivery_date}."))
+
+    def create_orders(self, chunk, prices, delivery_date):
+        # Orders, items aur last_generated_for ek hi transaction mein —
+        # beech mein crash ho toh poora chunk rollback, rerun pe wapas banega
+        with transaction.atomic():
+            # Upar wali list lock ke bina padhi thi — saath chal raha doosra run
+            # yahi subscriptions process kar chuka ho sakta hai. Chunk ki rows lock
+            # karke dobara check karo, aur sirf jo abhi bhi pending hain unke orders banao.
+            sub_ids = [sub_id for subs in chunk.values() for sub_id, _, _ in subs]
+            locked = set(
+                Subscription.objects.select_for_update()
+                .filter(id__in=sub_ids)
+                .filter(pending_for(delivery_date))
+                .values_list('id', flat=True)
+            )
+
+            orders = []
+            order_subs = []
+            for (user_id, address_id), subs in chunk.items():
+                subs = [sub for sub in subs if sub[0] in locked]
+                if not subs:
+                    continue
+                subtotal = sum((prices[product_id] * qty for _, product_id, qty in subs), Decimal('0.00'))
+                delivery_fee = Decimal('0.00') if subtotal >= FREE_DELIVERY_MIN else DELIVERY_FEE
+                orders.append(Order(
+                    user_id=user_id,
+                    shipping_address_id=address_id,
+                    subtotal=subtotal,
+                    delivery_fee=delivery_fee,
+                    total_amount=subtotal + delivery_fee,
+                    status='Pending',
+                    delivery_date=delivery_date,
+                ))
+                order_subs.append(subs)
+
+            Order.objects.bulk_create(orders)
+            items = []
+            for order, subs in zip(orders, order_subs):
+                for _, product_id, qty in subs:
+                    items.append(OrderItem(
+                        order_id=order.pk, product_id=product_id,
+                        price=prices[product_id], quantity=qty,
+                    ))
+            OrderItem.objects.bulk_create(items, batch_size=5000)
+            Subscription.objects.filter(id__in=locked).update(last_generated_for=delivery_date)
+
+        return len(orders)
@@ -0,0 +1,168 @@
+import csv
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal, InvalidOperation
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.catalog import invalidate_catalog
+from core.models import Product
+from core.routers import use_primary
+
+
+FIELDS = ['name', 'description', 'price', 'unit', 'badge']
+
+
+def file_checksum(path):
+    """sha256 of the file, ya None agar file nahi mili."""
+    if not os.path.isfile(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Command(BaseCommand):
+    help = (
+        "CSV ya JSONL file se products upsert karta hai (sku ke basis pe). "
+        "Columns: sku, name, description, price, unit, badge, image."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Catalog file (.csv ya .jsonl)")
+        parser.add_argument('--images-dir', default='', help="Relative image paths yahan se resolve honge")
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--workers', type=int, default=8, help="Image upload threads")
+        parser.add_argument('--dry-run', action='store_true', help="Sirf diff dikhao, DB mein kuch mat likho")
+        parser.add_argument('--diff', action='store_true', help="Har changed product ka field-level diff print karo")
+
+    @use_primary()
+    def handle(self, *args, **options):
+        rows = self.read_rows(options['path'])
+        if not rows:
+            self.stdout.write("No rows found.")
+            return
+
+        existing = Product.objects.in_bulk([r['sku'] for r in rows], field_name='sku')
+
+        products = []
+        uploads = []
+        created = updated = unchanged = 0
+
+        for row in rows:
+            current = existing.get(row['sku'])
+            changes = {}
+            for field in FIELDS:
+                old = getattr(current, field) if current else None
+                if old != row[field]:
+                    changes[field] = (old, row[field])
+
+            product = Product(sku=row['sku'], **{f: row[f] for f in FIELDS})
+            product.image = current.image.name if current else ''
+            product.image_checksum = current.image_checksum if current else ''
+
+            image_path = row['image']
+            if image_path:
+                source = os.path.join(options['images_dir'], image_path)
+                # Storage save pe naam badal deta hai (suffix) — content checksum se compare karo
+                checksum = file_checksum(source)
+                if (
+                    current is None or not current.image.name
+                    or checksum is None or checksum != current.image_checksum
+                ):
+                    changes['image'] = (current.image.name if current else None, image_path)
+                    product.image_checksum = checksum or ''
+                    uploads.append((product, source))
+
+            if current is None:
+                created += 1
+            elif changes:
+                updated += 1
+            else:
+                unchanged += 1
+                continue
+
+            if options['diff']:
+                label = 'NEW' if current is None else 'CHANGED'
+                self.stdout.write(f"{label} {row['sku']}")
+                for field, (old, new) in changes.items():
+                    self.stdout.write(f"    {field}: {old!r} -> {new!r}")
+
+            products.append(product)
+
+        self.stdout.write(
+            f"{created} to create, {updated} to update, {unchanged} unchanged, "
+            f"{len(uploads)} images to upload."
+        )
+
+        if options['dry_run'] or not products:
+            return
+
+        missing = [path for _, path in uploads if not os.path.isfile(path)]
+        if missing:
+            raise CommandError(f"Image files not found: {', '.join(missing[:5])}")
+
+        self.upload_images(uploads, options['workers'])
+
+        with transaction.atomic():
+            Product.objects.bulk_create(
+                products,
+                batch_size=options['batch_size'],
+                update_conflicts=True,
+                unique_fields=['sku'],
+                update_fields=FIELDS + ['image', 'image_checksum'],
+            )
+
+        # bulk_create signals fire nahi karta — ek hi baar cache invalidate
+        invalidate_catalog()
+        self.stdout.write(self.style.SUCCESS(f"Imported {len(products)} products."))
+
+    def read_rows(self, path):
+        if path.endswith('.jsonl'):
+            with open(path, encoding='utf-8') as f:
+                raw = [json.loads(line) for line in f if line.strip()]
+        elif path.endswith('.csv'):
+            with open(path, encoding='utf-8', newline='') as f:
+                raw = list(csv.DictReader(f))
+        else:
+            raise CommandError("Only .csv and .jsonl files are supported.")
+
+        rows = {}
+        for line_no, item in enumerate(raw, start=1):
+            sku = str(item.get('sku') or '').strip()
+            if not sku:
+                raise CommandError(f"Row {line_no}: sku is required.")
+            try:
+                price = Decimal(str(item.get('price'))).quantize(Decimal('0.01'))
+            except InvalidOperation:
+                raise CommandError(f"Row {line_no}: invalid price {item.get('price')!r}.")
+            # Same sku dobara aaye toh last row jeetegi
+            rows[sku] = {
+                'sku': sku,
+                'name': item.get('name', '').strip(),
+                'description': item.get('description', ''),
+                'price': price,
+                'unit': item.get('unit', '').strip(),
+                'badge': (item.get('badge') or '').strip() or None,
+                'image': (item.get('image') or '').strip(),
+            }
+        return list(rows.values())
+
+    def upload_images(self, uploads, workers):
+        def upload(job):
+            product, path = job
+            with open(path, 'rb') as f:
+                content = ContentFile(f.read())
+            name = product._meta.get_field('image').generate_filename(product, os.path.basename(path))
+            return product, default_storage.save(name, content)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for product, name in pool.map(upload, uploads):
+                product.image = name
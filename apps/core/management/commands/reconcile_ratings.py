@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Q, Sum
+
+from core.catalog import invalidate_catalog
+from core.models import Product, Review
+from core.routers import use_primary
+
+
+AGGREGATE_FIELDS = ['reviews_count', 'rating_sum'] + [f'rating_{i}_count' for i in range(1, 6)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Product ke denormalized review aggregates ko Review table se compare karta hai. "
+        "--fix ke saath drift theek bhi karta hai."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help="Drift wale products update karo")
+
+    @use_primary()
+    def handle(self, *args, **options):
+        # Ek grouped query: har product ke real aggregates
+        actual = {
+            row.pop('product_id'): row
+            for row in Review.objects.values('product_id').annotate(
+                reviews_count=Count('id'),
+                rating_sum=Sum('rating'),
+                **{f'rating_{i}_count': Count('id', filter=Q(rating=i)) for i in range(1, 6)},
+            ).order_by()
+        }
+        empty = dict.fromkeys(AGGREGATE_FIELDS, 0)
+
+        drifted = []
+        for product in Product.objects.only('id', 'name', 'rating', *AGGREGATE_FIELDS).iterator():
+            expected = actual.get(product.id, empty)
+            diffs = {
+                field: (getattr(product, field), expected[field])
+                for field in AGGREGATE_FIELDS if getattr(product, field) != expected[field]
+            }
+            if not diffs:
+                continue
+            self.stdout.write(f"{product.id} {product.name}: " + ", ".join(
+                f"{field} {stored} -> {real}" for field, (stored, real) in diffs.items()
+            ))
+            for field in AGGREGATE_FIELDS:
+                setattr(product, field, expected[field])
+            count = expected['reviews_count']
+            product.rating = round(expected['rating_sum'] / count, 2) if count else 0
+            drifted.append(product)
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS("No drift found."))
+            return
+
+        if options['fix']:
+            Product.objects.bulk_update(drifted, AGGREGATE_FIELDS + ['rating'], batch_size=500)
+            invalidate_catalog()
+            self.stdout.write(self.style.SUCCESS(f"Fixed {len(drifted)} products."))
+        else:
+            self.stdout.write(self.style.WARNING(f"{len(drifted)} products drifted. Run with --fix to repair."))
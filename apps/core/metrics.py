@@ -0,0 +1,122 @@
+import os
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, REGISTRY, generate_latest,
+)
+from prometheus_client import multiprocess
+
+
+# ---------------------------------------------------------------
+# Metrics (Prometheus)
+# ---------------------------------------------------------------
+# Har gunicorn worker apne counters rakhta hai. PROMETHEUS_MULTIPROC_DIR set ho
+# toh prometheus_client values mmap files mein likhta hai aur /metrics saare
+# workers ka total dikhata hai (gunicorn.conf.py dead workers saaf karta hai).
+
+VIEW_LATENCY = Histogram(
+    'daillyfresh_view_latency_seconds', 'View response time', ['view', 'method'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+VIEW_QUERIES = Histogram(
+    'daillyfresh_view_db_queries', 'DB queries per request', ['view'],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100),
+)
+CACHE_REQUESTS = Counter('daillyfresh_cache_requests', 'Cache lookups', ['cache', 'result'])
+
+ORDERS_PLACED = Counter('daillyfresh_orders_placed', 'Orders placed via checkout')
+# Sirf affiliate codes (jo waise bhi public share hote hain) label mein — baaki
+# codes 'other', warna /metrics coupon brute-force ki list ban jaata
+COUPON_REDEMPTIONS = Counter('daillyfresh_coupon_redemptions', 'Coupons used on orders', ['code'])
+CHECKOUT_FAILURES = Counter('daillyfresh_checkout_failures', 'place_order failures', ['exception'])
+
+
+# Request ka query counter — ContextVar, taaki async views ke sync_to_async
+# threads bhi usi request ke counter mein likhein
+_query_count = ContextVar('metrics_query_count', default=None)
+
+
+def count_queries(execute, sql, params, many, context):
+    counter = _query_count.get()
+    if counter is not None:
+        counter[0] += 1
+    return execute(sql, params, many, context)
+
+
+@receiver(connection_created)
+def install_query_counter(sender, connection, **kwargs):
+    if count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_queries)
+
+
+def cache_lookup(cache_name, hit):
+    CACHE_REQUESTS.labels(cache_name, 'hit' if hit else 'miss').inc()
+
+
+def coupon_redeemed(coupon):
+    COUPON_REDEMPTIONS.labels(coupon.code if coupon.is_affiliate else 'other').inc()
+
+
+class MetricsMiddleware:
+    # Sync aur async dono — ASGI mein async views ke aage thread hop nahi
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        counter = [0]
+        token = _query_count.set(counter)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _query_count.reset(token)
+        self.observe(request, time.perf_counter() - start, counter[0])
+        return response
+
+    async def __acall__(self, request):
+        counter = [0]
+        token = _query_count.set(counter)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _query_count.reset(token)
+        self.observe(request, time.perf_counter() - start, counter[0])
+        return response
+
+    def observe(self, request, elapsed, queries):
+        match = request.resolver_match
+        view = match.view_name if match else '<unresolved>'
+        if view != 'metrics':
+            VIEW_LATENCY.labels(view, request.method).observe(elapsed)
+            VIEW_QUERIES.labels(view).observe(queries)
+
+
+def metrics_view(request):
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if not token and getattr(settings, 'METRICS_REQUIRE_TOKEN', False):
+        # Production mein bina token ke endpoint band hai
+        raise Http404
+    if token and not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponseForbidden()
+
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
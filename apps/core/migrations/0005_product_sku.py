@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-19 13:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_coupon_order_discount_amount_order_coupon'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='sku',
+            field=models.CharField(blank=True, help_text='Catalog import ke liye unique code', max_length=64, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 6.0.2 on 2026-10-19 13:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def dedupe_default_addresses(apps, schema_editor):
+    # Constraint se pehle: jin users ke multiple defaults hain, sirf latest rakho
+    Address = apps.get_model('core', 'Address')
+    keep = {}
+    for address in Address.objects.filter(is_default=True).order_by('user_id', '-created_at', '-id'):
+        if address.user_id in keep:
+            Address.objects.filter(pk=address.pk).update(is_default=False)
+        else:
+            keep[address.user_id] = address.pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_product_sku'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_default_addresses, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='address',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_default', True)), fields=('user',), name='unique_default_address_per_user'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 6.0.2 on 2026-10-19 14:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_subscription'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DispatchManifest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('delivery_date', models.DateField()),
+                ('slot', models.CharField(choices=[('Morning', 'Morning (6-9 AM)'), ('Evening', 'Evening (5-8 PM)')], default='Morning', max_length=20)),
+                ('pincode', models.CharField(max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-delivery_date', 'slot', 'pincode'],
+                'constraints': [models.UniqueConstraint(fields=('delivery_date', 'slot', 'pincode'), name='unique_manifest_per_route')],
+            },
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='manifest',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='orders', to='core.dispatchmanifest'),
+        ),
+        migrations.CreateModel(
+            name='OrderStatusHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(max_length=20)),
+                ('to_status', models.CharField(max_length=20)),
+                ('changed_at', models.DateTimeField(auto_now_add=True)),
+                ('changed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_history', to='core.order')),
+            ],
+            options={
+                'verbose_name_plural': 'Order status history',
+                'ordering': ['-changed_at'],
+            },
+        ),
+    ]
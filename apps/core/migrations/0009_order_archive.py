@@ -0,0 +1,84 @@
+# Generated by Django 6.0.2 on 2026-10-19 14:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+COLUMNS = (
+    'id, user_id, shipping_address_id, subtotal, delivery_fee, coupon_id, '
+    'discount_amount, total_amount, status, delivery_date, created_at, updated_at'
+)
+
+CREATE_VIEW = f"""
+CREATE VIEW core_order_history AS
+    SELECT {COLUMNS}, FALSE AS is_archived FROM core_order
+    UNION ALL
+    SELECT {COLUMNS}, TRUE AS is_archived FROM core_archivedorder
+"""
+
+DROP_VIEW = 'DROP VIEW IF EXISTS core_order_history'
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_dispatch'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderHistory',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('subtotal', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('delivery_fee', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('discount_amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('total_amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('status', models.CharField(choices=[('Pending', 'Pending'), ('Processing', 'Processing'), ('Out for Delivery', 'Out for Delivery'), ('Delivered', 'Delivered'), ('Cancelled', 'Cancelled')], max_length=20)),
+                ('delivery_date', models.DateField(null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('is_archived', models.BooleanField()),
+            ],
+            options={
+                'verbose_name_plural': 'Order history',
+                'db_table': 'core_order_history',
+                'ordering': ['-created_at'],
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedOrder',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('subtotal', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('delivery_fee', models.DecimalField(decimal_places=2, default=0.0, max_digits=10)),
+                ('discount_amount', models.DecimalField(decimal_places=2, default=0.0, max_digits=10)),
+                ('total_amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('status', models.CharField(choices=[('Pending', 'Pending'), ('Processing', 'Processing'), ('Out for Delivery', 'Out for Delivery'), ('Delivered', 'Delivered'), ('Cancelled', 'Cancelled')], max_length=20)),
+                ('delivery_date', models.DateField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(db_index=True)),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('coupon', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.coupon')),
+                ('shipping_address', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.address')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedOrderItem',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('quantity', models.PositiveIntegerField(default=1)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='core.archivedorder')),
+                ('product', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.product')),
+            ],
+        ),
+        migrations.RunSQL(CREATE_VIEW, DROP_VIEW),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 6.0.2 on 2026-10-19 14:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_recommendations'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='archived_order_item',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='review', to='core.archivedorderitem'),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='order_item',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='review', to='core.orderitem'),
+        ),
+    ]
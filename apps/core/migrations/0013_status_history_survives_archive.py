@@ -0,0 +1,24 @@
+# Generated by Django 6.0.2 on 2026-10-19 14:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_review_survives_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderstatushistory',
+            name='archived_order',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='status_history', to='core.archivedorder'),
+        ),
+        migrations.AlterField(
+            model_name='orderstatushistory',
+            name='order',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='status_history', to='core.order'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 6.0.2 on 2026-10-19 14:23
+
+from django.db import migrations
+
+
+COLUMNS = (
+    'id, user_id, shipping_address_id, subtotal, delivery_fee, coupon_id, '
+    'discount_amount, total_amount, status, delivery_date, created_at, updated_at'
+)
+
+CREATE_VIEW = f"""
+CREATE VIEW core_order_history AS
+    SELECT {COLUMNS}, FALSE AS is_archived FROM core_order
+    UNION ALL
+    SELECT {COLUMNS}, TRUE AS is_archived FROM core_archivedorder
+"""
+
+DROP_VIEW = 'DROP VIEW IF EXISTS core_order_history'
+
+
+class Migration(migrations.Migration):
+    # View core_order par Order ki har schema change rok deta tha
+    # (SQLite table rebuild, Postgres column type change) — ab core.archive.order_history()
+
+    dependencies = [
+        ('core', '0013_status_history_survives_archive'),
+    ]
+
+    operations = [
+        migrations.RunSQL(DROP_VIEW, CREATE_VIEW),
+        migrations.DeleteModel(
+            name='OrderHistory',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-19 14:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_drop_order_history_view'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='image_checksum',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+    ]
@@ -1,5 +1,5 @@
-from django.db import models
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Q
 from django.db.models.signals import post_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import User
@@ -23,15 +23,25 @@ class HomeHero(models.Model):
 
 # Products model
 class Product(models.Model):
+    sku = models.CharField(max_length=64, unique=True, null=True, blank=True, help_text="Catalog import ke liye unique code")
     name = models.CharField(max_length=200)
     description = models.TextField()
     price = models.DecimalField(max_digits=10, decimal_places=2)
     unit = models.CharField(max_length=50, help_text="e.g., 1000 ml, 500 gm")
     image = models.ImageField(upload_to='products/')
-    rating = models.DecimalField(max_digits=3, decimal_places=2, default=5.0)
+    # import_catalog: source image ka sha256 — storage file rename kar deta hai, naam se compare nahi ho sakta
+    image_checksum = models.CharField(max_length=64, blank=True, default='', editable=False)
+    # Review aggregates — core.reviews F() updates se maintain hote hain, haath se mat badlo
+    rating = models.DecimalField(max_digits=3, decimal_places=2, default=0)
     # is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    reviews_count = models.IntegerField(default=5)
+    reviews_count = models.IntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_1_count = models.PositiveIntegerField(default=0)
+    rating_2_count = models.PositiveIntegerField(default=0)
+    rating_3_count = models.PositiveIntegerField(default=0)
+    rating_4_count = models.PositiveIntegerField(default=0)
+    rating_5_count = models.PositiveIntegerField(default=0)
     badge = models.CharField(max_length=50, blank=True, null=True, help_text="e.g., 'Best Seller', 'New Arrival'")
     # updated_at = models.DateTimeField(auto_now=True)
     
@@ -58,15 +68,64 @@ class Address(models.Model):
     class Meta:
         verbose_name_plural = 'Addresses'
         ordering = ['-is_default', '-created_at']
+        constraints = [
+            # Ek user ka sirf ek default address (partial unique index)
+            models.UniqueConstraint(
+                fields=['user'],
+                condition=Q(is_default=True),
+                name='unique_default_address_per_user',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.full_name} - {self.city} ({self.pincode})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # DB mein pehle se default tha ya nahi — save() pe bekaar update se bachne ke liye
+        instance._was_default = instance.is_default
+        return instance
+
     def save(self, *args, **kwargs):
         # Ensure only one default address exists per user
-        if self.is_default:
-            Address.objects.filter(user=self.user).update(is_default=False)
-        super().save(*args, **kwargs)
+        if self.is_default and not getattr(self, '_was_default', False):
+            # make_default() wala hi locked path — 'Add New Address' (default ke saath)
+            # ke parallel submits unique constraint pe IntegrityError nahi denge
+            with transaction.atomic():
+                self._lock_user()
+                self._clear_previous_default()
+                super().save(*args, **kwargs)
+        else:
+            super().save(*args, **kwargs)
+        self._was_default = self.is_default
+
+    def _lock_user(self):
+        # User row lock — same user ke parallel default changes line mein lagenge
+        list(User.objects.select_for_update().filter(pk=self.user_id).values_list('pk', flat=True))
+
+    def _clear_previous_default(self):
+        # Sirf purani default row touch hoti hai, poori user ki list nahi
+        previous = Address.objects.filter(user_id=self.user_id, is_default=True)
+        if self.pk:
+            previous = previous.exclude(pk=self.pk)
+        previous.update(is_default=False)
+
+    def make_default(self):
+        """
+        Is address ko user ka default banao — ek transaction mein purana
+        default hatao aur naya set karo, taaki beech mein zero ya do
+        defaults kabhi dikhein nahi.
+        """
+        with transaction.atomic():
+            self._lock_user()
+            self._clear_previous_default()
+            Address.objects.filter(pk=self.pk).update(is_default=True)
+        self.is_default = True
+        self._was_default = True
+        # update() signal nahi bhejta — cached address book khud hatao
+        from .accounts import invalidate_address_book
+        invalidate_address_book(self.user_id)
 
 
 # --- Order Model ---
@@ -90,6 +149,8 @@ class Order(models.Model):
     total_amount = models.DecimalField(max_digits=10, decimal_places=2)
     
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Pending')
+    delivery_date = models.DateField(null=True, blank=True, db_index=True, help_text="Subscription orders ke liye")
+    manifest = models.ForeignKey('DispatchManifest', on_delete=models.SET_NULL, null=True, blank=True, related_name='orders')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -148,4 +209,195 @@ class Coupon(models.Model):
         if self.is_active and self.valid_from <= now <= self.valid_to:
             if self.max_uses is None or self.total_uses < self.max_uses:
                 return True
-        return False
\ No newline at end of file
+        return False
+
+
+# --- Subscription Model ---
+class Subscription(models.Model):
+    SCHEDULE_CHOICES = (
+        ('Daily', 'Daily'),
+        ('Alternate', 'Alternate Days'),
+        ('Weekly', 'Weekly'),
+    )
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='subscriptions')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='subscriptions')
+    quantity = models.PositiveIntegerField(default=1)
+    shipping_address = models.ForeignKey(Address, on_delete=models.CASCADE, related_name='subscriptions')
+    schedule = models.CharField(max_length=20, choices=SCHEDULE_CHOICES, default='Daily')
+
+    start_date = models.DateField(default=timezone.localdate)
+    end_date = models.DateField(null=True, blank=True)
+    is_active = models.BooleanField(default=True)
+
+    # Idempotency: is date tak ke orders ban chuke hain
+    last_generated_for = models.DateField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.quantity}x {self.product.name} ({self.schedule}) - {self.user.username}"
+
+    def is_due(self, date):
+        if not self.is_active or date < self.start_date:
+            return False
+        if self.end_date and date > self.end_date:
+            return False
+        return schedule_matches(self.schedule, self.start_date, date)
+
+
+def schedule_matches(schedule, start_date, date):
+    days = (date - start_date).days
+    if schedule == 'Alternate':
+        return days % 2 == 0
+    if schedule == 'Weekly':
+        return days % 7 == 0
+    return True
+
+
+
+# --- Dispatch Models ---
+class DispatchManifest(models.Model):
+    SLOT_CHOICES = (
+        ('Morning', 'Morning (6-9 AM)'),
+        ('Evening', 'Evening (5-8 PM)'),
+    )
+
+    delivery_date = models.DateField()
+    slot = models.CharField(max_length=20, choices=SLOT_CHOICES, default='Morning')
+    pincode = models.CharField(max_length=10)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-delivery_date', 'slot', 'pincode']
+        constraints = [
+            models.UniqueConstraint(fields=['delivery_date', 'slot', 'pincode'], name='unique_manifest_per_route'),
+        ]
+
+    def __str__(self):
+        return f"{self.delivery_date} {self.slot} - {self.pincode}"
+
+
+class OrderStatusHistory(models.Model):
+    # Audit rows kabhi delete nahi hote — order archive hone pe archived_order pe shift (core.archive)
+    order = models.ForeignKey(
+        Order, on_delete=models.SET_NULL, null=True, blank=True, related_name='status_history',
+    )
+    archived_order = models.ForeignKey(
+        'ArchivedOrder', on_delete=models.SET_NULL, null=True, blank=True, related_name='status_history',
+    )
+    from_status = models.CharField(max_length=20)
+    to_status = models.CharField(max_length=20)
+    changed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    changed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-changed_at']
+        verbose_name_plural = 'Order status history'
+
+    def __str__(self):
+        order_id = self.order_id or self.archived_order_id
+        return f"Order #{order_id}: {self.from_status} -> {self.to_status}"
+
+
+
+# --- Archive Models ---
+# Purane Delivered/Cancelled orders yahan move hote hain (core.archive),
+# taaki live Order table chhoti rahe. IDs wahi rehti hain jo live table mein thi.
+class ArchivedOrder(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    shipping_address = models.ForeignKey(Address, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    subtotal = models.DecimalField(max_digits=10, decimal_places=2)
+    delivery_fee = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
+    coupon = models.ForeignKey('Coupon', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    discount_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
+    total_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    delivery_date = models.DateField(null=True, blank=True)
+    created_at = models.DateTimeField(db_index=True)
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Archived Order #{self.id}"
+
+
+class ArchivedOrderItem(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    order = models.ForeignKey(ArchivedOrder, on_delete=models.CASCADE, related_name='items')
+    product = models.ForeignKey('Product', on_delete=models.SET_NULL, null=True, related_name='+')
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    quantity = models.PositiveIntegerField(default=1)
+
+    def get_cost(self):
+        return self.price * self.quantity
+
+
+
+# --- Review Model ---
+class Review(models.Model):
+    RATING_CHOICES = [(i, f'{i} Star') for i in range(1, 6)]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reviews')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='reviews')
+    # Sirf delivered order item pe review — ek item, ek review. Order archive
+    # hone pe review archived item pe shift hota hai (core.archive), delete nahi.
+    order_item = models.OneToOneField(
+        OrderItem, on_delete=models.SET_NULL, null=True, blank=True, related_name='review',
+    )
+    archived_order_item = models.OneToOneField(
+        ArchivedOrderItem, on_delete=models.SET_NULL, null=True, blank=True, related_name='review',
+    )
+    rating = models.PositiveSmallIntegerField(choices=RATING_CHOICES)
+    comment = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        constraints = [
+            models.CheckConstraint(condition=Q(rating__gte=1, rating__lte=5), name='review_rating_1_to_5'),
+        ]
+
+    def __str__(self):
+        return f"{self.rating}* {self.product.name} by {self.user.username}"
+
+
+
+# --- Recommendation Models ("Frequently bought together") ---
+class ProductPair(models.Model):
+    """Kitne orders mein product aur other saath khareede gaye (dono directions mein row)."""
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    other = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'other'], name='unique_product_pair'),
+        ]
+
+
+class ProductNeighbor(models.Model):
+    """Har product ke top-K pairs — cart page sirf ye table padhta hai."""
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='neighbors')
+    neighbor = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    rank = models.PositiveSmallIntegerField()
+    score = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ['product', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'rank'], name='unique_neighbor_rank'),
+        ]
+
+
+class RecommendationState(models.Model):
+    """Single row: build_recommendations kis order tak process kar chuka hai."""
+    last_order_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
@@ -0,0 +1,168 @@
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
+
+
+# ---------------------------------------------------------------
+# Rate limiting
+# ---------------------------------------------------------------
+# Sliding window counter: har (scope, key) ke liye har window ka ek counter
+# cache mein rehta hai. Current count = is window ke hits + pichhli window
+# ke hits utne hisse mein jitni pichhli window abhi bhi last `period` seconds
+# mein aati hai. Isse window boundary pe 2x burst nahi milta (fixed window
+# mein boundary ke dono taraf poora limit mil jaata tha). cache.add() +
+# cache.incr() dono atomic hain, isliye multiple workers ek shared cache
+# (Redis/Memcached) pe sahi count karte hain.
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """'5/m' -> (5, 60). '10/5m' bhi chalega -> (10, 300)."""
+    count, period = rate.split('/')
+    multiplier = int(period[:-1]) if len(period) > 1 else 1
+    return int(count), multiplier * PERIODS[period[-1]]
+
+
+def client_ip(request):
+    if getattr(settings, 'RATELIMIT_USE_X_FORWARDED_FOR', False):
+        # Leftmost entry client khud bhej sakta hai — har proxy right mein append
+        # karta hai, toh trusted proxies ke hisaab se right se N-th entry lo
+        hops = getattr(settings, 'RATELIMIT_TRUSTED_PROXY_COUNT', 1)
+        forwarded = [ip.strip() for ip in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if ip.strip()]
+        if len(forwarded) >= hops:
+            return forwarded[-hops]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def get_key(request, key):
+    if key == 'ip':
+        return client_ip(request)
+    if key == 'user':
+        return str(request.user.pk) if request.user.is_authenticated else None
+    if key == 'user_or_ip':
+        if request.user.is_authenticated:
+            return f'u{request.user.pk}'
+        return client_ip(request)
+    return key(request)
+
+
+async def aget_key(request, key):
+    if key in ('user', 'user_or_ip'):
+        # Async view mein request.user lazy DB query karega — auser() use karo
+        user = await request.auser()
+        if user.is_authenticated:
+            return str(user.pk) if key == 'user' else f'u{user.pk}'
+        return None if key == 'user' else client_ip(request)
+    return get_key(request, key)
+
+
+def _windows(scope, ident, rate):
+    limit, period = parse_rate(rate)
+    now = time.time()
+    window = int(now // period)
+    # Pichhli window ka kitna hissa abhi bhi last `period` seconds mein hai
+    weight = 1 - (now - window * period) / period
+    current = f'rl:{scope}:{ident}:{window}'
+    previous = f'rl:{scope}:{ident}:{window - 1}'
+    retry_after = max(int((window + 1) * period - now), 1)
+    return current, previous, limit, period, weight, retry_after
+
+
+def _allowed(count, previous_count, limit, weight):
+    return previous_count * weight + count <= limit
+
+
+def hit(scope, ident, rate):
+    """
+    Ek hit record karo. Returns (allowed, retry_after_seconds).
+    """
+    current, previous, limit, period, weight, retry_after = _windows(scope, ident, rate)
+
+    # add() sirf tab set karta hai jab key na ho — window ka pehla hit.
+    # 2 * period tak rakho, taaki agli window isse "previous" ki tarah padh sake.
+    if cache.add(current, 1, period * 2):
+        count = 1
+    else:
+        try:
+            count = cache.incr(current)
+        except ValueError:
+            # Key beech mein expire ho gayi
+            cache.add(current, 1, period * 2)
+            count = 1
+
+    if not _allowed(count, cache.get(previous, 0), limit, weight):
+        return False, retry_after
+    return True, 0
+
+
+async def ahit(scope, ident, rate):
+    current, previous, limit, period, weight, retry_after = _windows(scope, ident, rate)
+
+    if await cache.aadd(current, 1, period * 2):
+        count = 1
+    else:
+        try:
+            count = await cache.aincr(current)
+        except ValueError:
+            await cache.aadd(current, 1, period * 2)
+            count = 1
+
+    if not _allowed(count, await cache.aget(previous, 0), limit, weight):
+        return False, retry_after
+    return True, 0
+
+
+def too_many_requests(request, retry_after):
+    message = 'Too many attempts. Please wait a moment and try again.'
+    if request.content_type == 'application/json':
+        response = JsonResponse({'success': False, 'message': message}, status=429)
+    else:
+        response = HttpResponse(message, status=429, content_type='text/plain')
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def ratelimit(scope, rate, key='ip', methods=('POST',)):
+    """
+    View decorator. `key` 'ip', 'user', 'user_or_ip' ya ek callable ho
+    sakta hai. Sirf `methods` wali requests count hoti hain (None = sab).
+    Multiple decorators stack kar sakte ho — e.g. ek IP pe aur ek user pe.
+    Sync aur async dono tarah ke views pe kaam karta hai.
+    """
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def _awrapped(request, *args, **kwargs):
+                if not getattr(settings, 'RATELIMIT_ENABLE', True):
+                    return await view_func(request, *args, **kwargs)
+                if methods is not None and request.method not in methods:
+                    return await view_func(request, *args, **kwargs)
+
+                ident = await aget_key(request, key)
+                if ident is not None:
+                    allowed, retry_after = await ahit(scope, ident, rate)
+                    if not allowed:
+                        return too_many_requests(request, retry_after)
+                return await view_func(request, *args, **kwargs)
+            return _awrapped
+
+        @wraps(view_func)
+        def _wrapped(request, *args, **kwargs):
+            if not getattr(settings, 'RATELIMIT_ENABLE', True):
+                return view_func(request, *args, **kwargs)
+            if methods is not None and request.method not in methods:
+                return view_func(request, *args, **kwargs)
+
+            ident = get_key(request, key)
+            if ident is not None:
+                allowed, retry_after = hit(scope, ident, rate)
+                if not allowed:
+                    return too_many_requests(request, retry_after)
+            return view_func(request, *args, **kwargs)
+        return _wrapped
+    return decorator
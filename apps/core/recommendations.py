@@ -0,0 +1,186 @@
+from collections import Counter, defaultdict
+from datetime import timedelta
+from itertools import permutations
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .cache_versions import bump_version, get_version
+from .catalog import get_products
+from .metrics import cache_lookup
+from .models import Order, OrderItem, ProductNeighbor, ProductPair, RecommendationState
+from .routers import use_primary
+
+
+# ---------------------------------------------------------------
+# "Frequently bought together"
+# ---------------------------------------------------------------
+# build_recommendations naye orders ko chunks mein padhta hai, ProductPair
+# counts badhata hai, phir jin products ke pairs badle unke top-K
+# ProductNeighbor rows dobara likhta hai. Cart page sirf neighbors padhta
+# hai (cached), pairs table kabhi nahi.
+
+RECS_VERSION_KEY = 'recs:version'
+RECS_TIMEOUT = 60 * 60
+
+
+def settled_before(last_order_id, settle_seconds):
+    """
+    Cursor ki upper bound: pehla order jo settle_seconds se naya hai. Order aur
+    uske items alag autocommits mein insert hote hain — bilkul naye orders ke
+    items shayad abhi dikh na rahe hon, toh cursor unke aage nahi jaata.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settle_seconds)
+    return (
+        Order.objects.filter(id__gt=last_order_id, created_at__gte=cutoff)
+        .order_by('id').values_list('id', flat=True).first()
+    )
+
+
+@use_primary()
+def build_recommendations(chunk_size=2000, top_k=8, full=False, settle_seconds=None, log=None):
+    """
+    Incremental build. Returns (orders_processed, products_updated).
+    Har chunk apne transaction mein cursor aage badhata hai — restartable.
+    State row select_for_update() se locked rehti hai, toh do parallel runs
+    same orders do baar nahi gin sakte.
+    """
+    if settle_seconds is None:
+        settle_seconds = getattr(settings, 'RECOMMENDATIONS_SETTLE_SECONDS', 300)
+    RecommendationState.objects.get_or_create(pk=1)
+    if full:
+        with transaction.atomic():
+            state = RecommendationState.objects.select_for_update().get(pk=1)
+            ProductPair.objects.all().delete()
+            ProductNeighbor.objects.all().delete()
+            state.last_order_id = 0
+            state.save()
+
+    touched = set()
+    processed = 0
+    while True:
+        with transaction.atomic():
+            state = RecommendationState.objects.select_for_update().get(pk=1)
+            orders = Order.objects.filter(id__gt=state.last_order_id)
+            boundary = settled_before(state.last_order_id, settle_seconds)
+            if boundary is not None:
+                orders = orders.filter(id__lt=boundary)
+            order_ids = list(
+                orders.exclude(status='Cancelled')
+                .order_by('id').values_list('id', flat=True)[:chunk_size]
+            )
+            if not order_ids:
+                break
+
+            baskets = defaultdict(set)
+            items = OrderItem.objects.filter(order_id__in=order_ids, product__isnull=False)
+            for order_id, product_id in items.values_list('order_id', 'product_id'):
+                baskets[order_id].add(product_id)
+
+            deltas = Counter()
+            for products in baskets.values():
+                deltas.update(permutations(sorted(products), 2))
+
+            apply_pair_deltas(deltas)
+            state.last_order_id = order_ids[-1]
+            state.save(update_fields=['last_order_id', 'updated_at'])
+
+        touched.update(product_id for product_id, _ in deltas)
+        processed += len(order_ids)
+        if log:
+            log(f"  {processed} orders, {len(deltas)} pair updates in last chunk")
+
+    if touched:
+        rebuild_neighbors(touched, top_k)
+    if touched or full:
+        invalidate_recommendations()
+    return processed, len(touched)
+
+
+def apply_pair_deltas(deltas):
+    if not deltas:
+        return
+    products = {p for p, _ in deltas}
+    others = {o for _, o in deltas}
+    existing = {
+        (pair.product_id, pair.other_id): pair
+        for pair in ProductPair.objects.filter(product_id__in=products, other_id__in=others)
+    }
+    to_update, to_create = [], []
+    for key, delta in deltas.items():
+        pair = existing.get(key)
+        if pair is None:
+            to_create.append(ProductPair(product_id=key[0], other_id=key[1], count=delta))
+        else:
+            pair.count += delta
+            to_update.append(pair)
+    ProductPair.objects.bulk_update(to_update, ['count'], batch_size=1000)
+    ProductPair.objects.bulk_create(to_create, batch_size=1000)
+
+
+def rebuild_neighbors(product_ids, top_k):
+    neighbors = []
+    for product_id in product_ids:
+        top = (
+            ProductPair.objects.filter(product_id=product_id)
+            .order_by('-count', 'other_id').values_list('other_id', 'count')[:top_k]
+        )
+        neighbors.extend(
+            ProductNeighbor(product_id=product_id, neighbor_id=other_id, rank=rank, score=count)
+            for rank, (other_id, count) in enumerate(top, start=1)
+        )
+    with transaction.atomic():
+        ProductNeighbor.objects.filter(product_id__in=product_ids).delete()
+        ProductNeighbor.objects.bulk_create(neighbors, batch_size=1000)
+
+
+def recs_version():
+    return get_version(RECS_VERSION_KEY)
+
+
+def invalidate_recommendations():
+    bump_version(RECS_VERSION_KEY)
+
+
+def neighbor_ids(product_ids):
+    """{product_id: [neighbor ids by rank]} — cache se, miss pe ek query."""
+    version = recs_version()
+    keys = {f'recs:{version}:{pid}': pid for pid in product_ids}
+    found = cache.get_many(keys)
+    result = {keys[key]: value for key, value in found.items()}
+
+    missing = [pid for pid in product_ids if pid not in result]
+    cache_lookup('recommendations', not missing)
+    if missing:
+        fetched = {pid: [] for pid in missing}
+        rows = ProductNeighbor.objects.filter(product_id__in=missing).values_list('product_id', 'neighbor_id')
+        for product_id, neighbor_id in rows:
+            fetched[product_id].append(neighbor_id)
+        cache.set_many({f'recs:{version}:{pid}': ids for pid, ids in fetched.items()}, RECS_TIMEOUT)
+        result.update(fetched)
+    return result
+
+
+def get_recommendations(product_ids, limit=4):
+    """Cart ke products ke liye top recommendations (cart wale products chhod ke)."""
+    product_ids = list(dict.fromkeys(product_ids))
+    if not product_ids:
+        return []
+
+    # Best rank jeetta hai; barabar rank pe zyada cart products se aaya hua aage
+    best_rank = {}
+    votes = Counter()
+    for ids in neighbor_ids(product_ids).values():
+        for rank, neighbor_id in enumerate(ids):
+            best_rank[neighbor_id] = min(rank, best_rank.get(neighbor_id, rank))
+            votes[neighbor_id] += 1
+
+    exclude = set(product_ids)
+    ranked = sorted(
+        (pid for pid in best_rank if pid not in exclude),
+        key=lambda pid: (best_rank[pid], -votes[pid], pid),
+    )
+    catalog = {product.id: product for product in get_products()}
+    return [catalog[pid] for pid in ranked if pid in catalog][:limit]
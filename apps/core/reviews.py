@@ -0,0 +1,102 @@
+from django.db import transaction
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Cast
+
+from .catalog import invalidate_catalog
+from .models import OrderItem, Product, Review
+
+
+# ---------------------------------------------------------------
+# Reviews + denormalized product aggregates
+# ---------------------------------------------------------------
+# Product.reviews_count, rating_sum, rating_N_count aur rating (average)
+# har insert/edit/delete pe F() se update hote hain — product grid kabhi
+# reviews table nahi padhta. Drift check: manage.py reconcile_ratings.
+
+class ReviewError(Exception):
+    pass
+
+
+def histogram_field(rating):
+    return f'rating_{rating}_count'
+
+
+def apply_delta(product_id, count=0, total=0, remove=None, add=None):
+    """Aggregates pe delta lagao — ek UPDATE counts ke liye, ek average ke liye."""
+    changes = {}
+    if count:
+        changes['reviews_count'] = F('reviews_count') + count
+    if total:
+        changes['rating_sum'] = F('rating_sum') + total
+    if remove:
+        changes[histogram_field(remove)] = F(histogram_field(remove)) - 1
+    if add:
+        changes[histogram_field(add)] = F(histogram_field(add)) + 1
+    if not changes:
+        return
+
+    products = Product.objects.filter(pk=product_id)
+    products.update(**changes)
+    # Doosra statement naye sum/count padhta hai (row abhi bhi locked hai)
+    products.update(rating=Case(
+        When(reviews_count__gt=0, then=Cast(F('rating_sum'), FloatField()) / F('reviews_count')),
+        default=Value(0.0),
+        output_field=FloatField(),
+    ))
+
+
+def validate_rating(rating):
+    try:
+        rating = int(rating)
+    except (TypeError, ValueError):
+        raise ReviewError("Rating must be a number from 1 to 5.")
+    if not 1 <= rating <= 5:
+        raise ReviewError("Rating must be a number from 1 to 5.")
+    return rating
+
+
+def submit_review(user, order_item_id, rating, comment=''):
+    """Naya review, ya us item ka purana review update."""
+    rating = validate_rating(rating)
+    with transaction.atomic():
+        try:
+            # Item row lock — pehla review abhi exist nahi karta toh Review pe
+            # select_for_update kuch lock nahi karta, aur do parallel submits dono insert karte
+            item = OrderItem.objects.select_for_update(of=('self',)).select_related('order').get(
+                pk=order_item_id, order__user=user,
+            )
+        except OrderItem.DoesNotExist:
+            raise ReviewError("Order item not found.")
+        if item.order.status != 'Delivered':
+            raise ReviewError("You can review a product once it has been delivered.")
+        if item.product_id is None:
+            raise ReviewError("This product is no longer available.")
+
+        review = Review.objects.select_for_update().filter(order_item=item).first()
+        if review is None:
+            review = Review.objects.create(
+                user=user, product_id=item.product_id, order_item=item,
+                rating=rating, comment=comment,
+            )
+            apply_delta(item.product_id, count=1, total=rating, add=rating)
+        else:
+            old_rating = review.rating
+            review.rating = rating
+            review.comment = comment
+            review.save(update_fields=['rating', 'comment', 'updated_at'])
+            if old_rating != rating:
+                apply_delta(item.product_id, total=rating - old_rating, remove=old_rating, add=rating)
+
+    invalidate_catalog()
+    return review
+
+
+def delete_review(user, review_id):
+    with transaction.atomic():
+        try:
+            review = Review.objects.select_for_update().get(pk=review_id, user=user)
+        except Review.DoesNotExist:
+            raise ReviewError("Review not found.")
+        review.delete()
+        apply_delta(review.product_id, count=-1, total=-review.rating, remove=review.rating)
+    invalidate_catalog()
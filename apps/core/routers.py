@@ -0,0 +1,113 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+
+# ---------------------------------------------------------------
+# Read replica routing
+# ---------------------------------------------------------------
+# Catalog, coupon lookup aur reporting (Order/OrderItem) ke reads replicas
+# pe jaate hain. Baaki sab (auth, sessions, addresses) aur saare writes
+# primary ('default') pe. Jab primary pinned ho, ya transaction.atomic() ke
+# andar, saare reads bhi primary pe. Batch management commands poore
+# use_primary() mein chalte hain (ye decorator ki tarah bhi kaam karta hai).
+
+REPLICA_MODELS = {
+    'core.product', 'core.homehero', 'core.coupon', 'core.order', 'core.orderitem',
+    'core.archivedorder', 'core.archivedorderitem', 'core.productneighbor',
+}
+
+PIN_COOKIE = 'db_primary_pin'
+
+_pinned = ContextVar('db_primary_pinned', default=False)
+
+
+@contextmanager
+def use_primary():
+    """Block ke andar saare reads primary DB se."""
+    token = _pinned.set(True)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+def replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        aliases = replicas()
+        if not aliases or _pinned.get():
+            return 'default'
+        if connections['default'].in_atomic_block:
+            # Primary pe transaction khula hai — replica pe apne hi uncommitted
+            # writes (aur select_for_update ke locks) nahi dikhenge
+            return 'default'
+        if model._meta.label_lower in REPLICA_MODELS:
+            return random.choice(aliases)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas primary ki copy hain — cross-alias relations theek hain
+        return True
+
+
+class PrimaryPinMiddleware:
+    """
+    Read-your-writes: kisi bhi write request (POST, etc.) ke baad user ke reads
+    kuch seconds ke liye primary pe pinned rehte hain (cookie ke through),
+    taaki place_order ke turant baad replica lag se purana data na dikhe.
+    """
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+    # ASGI mein async views ke aage thread hop na ho
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not replicas():
+            return self.get_response(request)
+
+        is_write = request.method not in self.SAFE_METHODS
+        if is_write or request.COOKIES.get(PIN_COOKIE):
+            with use_primary():
+                response = self.get_response(request)
+        else:
+            response = self.get_response(request)
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        if not replicas():
+            return await self.get_response(request)
+
+        is_write = request.method not in self.SAFE_METHODS
+        if is_write or request.COOKIES.get(PIN_COOKIE):
+            with use_primary():
+                response = await self.get_response(request)
+        else:
+            response = await self.get_response(request)
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        if request.method not in self.SAFE_METHODS:
+            response.set_cookie(
+                PIN_COOKIE, '1',
+                max_age=getattr(settings, 'DATABASE_PRIMARY_PIN_SECONDS', 5),
+                httponly=True, samesite='Lax',
+            )
+        return response
@@ -0,0 +1,95 @@
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+
+from .metrics import cache_lookup
+
+
+# ---------------------------------------------------------------
+# Cached media URLs
+# ---------------------------------------------------------------
+# index.html har product ke liye image.url call karta hai. Cloudinary mein
+# ye har baar SDK ka URL builder chalata hai — yahan resolved URL process
+# memory mein (bounded LRU) yaad rakhte hain. Naya upload naya naam leta hai,
+# aur save()/delete() us naam ki entries hata dete hain.
+
+class LRUCache:
+    def __init__(self, maxsize, name='media_url'):
+        self.maxsize = maxsize
+        self.name = name
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            try:
+                self.data.move_to_end(key)
+            except KeyError:
+                value = None
+            else:
+                value = self.data[key]
+        cache_lookup(self.name, value is not None)
+        return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.data[key] = value
+            self.data.move_to_end(key)
+            if len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def discard_name(self, name):
+        with self.lock:
+            for key in [k for k in self.data if k[0] == name]:
+                del self.data[key]
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+
+class CachedURLMixin:
+    """
+    Storage mixin: url() aur positive exists() results memoize karta hai,
+    (name, transformation) key pe.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.url_cache = LRUCache(getattr(settings, 'MEDIA_URL_CACHE_SIZE', 2048))
+
+    def build_url(self, name, **options):
+        return super().url(name)
+
+    def url(self, name, **options):
+        if not name:
+            return super().url(name)
+        key = (name, tuple(sorted(options.items())))
+        url = self.url_cache.get(key)
+        if url is None:
+            url = self.build_url(name, **options)
+            self.url_cache.set(key, url)
+        return url
+
+    def exists(self, name):
+        key = (name, 'exists')
+        if self.url_cache.get(key):
+            return True
+        found = super().exists(name)
+        if found:
+            self.url_cache.set(key, True)
+        return found
+
+    def save(self, name, content, max_length=None):
+        name = super().save(name, content, max_length=max_length)
+        self.url_cache.discard_name(name)
+        return name
+
+    def delete(self, name):
+        self.url_cache.discard_name(name)
+        return super().delete(name)
+
+
+class CachedFileSystemStorage(CachedURLMixin, FileSystemStorage):
+    pass
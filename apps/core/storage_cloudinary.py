@@ -0,0 +1,18 @@
+import cloudinary
+from cloudinary_storage.storage import MediaCloudinaryStorage
+
+from .storage import CachedURLMixin
+
+
+# Alag module: cloudinary_storage import pe hi CLOUDINARY_STORAGE settings
+# padhta hai, isliye sirf production settings isse load karti hain.
+class CachedMediaCloudinaryStorage(CachedURLMixin, MediaCloudinaryStorage):
+    def build_url(self, name, **options):
+        if not options:
+            return super().build_url(name)
+        # Transformations (width, height, crop, ...) Cloudinary URL mein
+        resource = cloudinary.CloudinaryResource(
+            self._prepend_prefix(name),
+            default_resource_type=self._get_resource_type(name),
+        )
+        return resource.build_url(**options)
@@ -0,0 +1,62 @@
+import re
+
+from django.conf import settings
+from django.template.loaders import app_directories, filesystem
+
+
+# ---------------------------------------------------------------
+# Template minification (compile time)
+# ---------------------------------------------------------------
+# Loader template source ko compile se pehle minify karta hai. Cached loader
+# ke andar lagao — minify ek hi baar hota hai, har request pe nahi.
+#
+# Safe minification hi karte hain: HTML comments hatao, har line ki leading
+# indentation aur khaali lines hatao. Newlines wahi rehti hain, taaki
+# Alpine x-data / <script> ke andar JS (// comments, ASI) na toote.
+# <pre> aur <textarea> ko chhedte nahi.
+
+PRESERVE_RE = re.compile(r'(<(pre|textarea)\b.*?</\2>)', re.IGNORECASE | re.DOTALL)
+SCRIPT_STYLE_RE = re.compile(r'(<(script|style)\b.*?</\2>)', re.IGNORECASE | re.DOTALL)
+COMMENT_RE = re.compile(r'<!--(?!\[if).*?-->', re.DOTALL)
+INDENT_RE = re.compile(r'^[ \t]+|[ \t]+$', re.MULTILINE)
+BLANK_LINES_RE = re.compile(r'\n{2,}')
+
+
+def strip_whitespace(source):
+    source = INDENT_RE.sub('', source)
+    return BLANK_LINES_RE.sub('\n', source)
+
+
+def minify_html(source):
+    parts = PRESERVE_RE.split(source)
+    out = []
+    # split() groups: [text, full match, tag name, text, ...]
+    for i in range(0, len(parts), 3):
+        text = parts[i]
+        # Script/style ke andar comments mat chhedo, sirf indentation
+        chunks = SCRIPT_STYLE_RE.split(text)
+        for j in range(0, len(chunks), 3):
+            chunks[j] = COMMENT_RE.sub('', chunks[j])
+            if j + 1 < len(chunks):
+                chunks[j + 2] = ''
+        text = ''.join(chunks)
+        out.append(strip_whitespace(text))
+        if i + 1 < len(parts):
+            out.append(parts[i + 1])
+    return ''.join(out)
+
+
+class MinifyMixin:
+    def get_contents(self, origin):
+        contents = super().get_contents(origin)
+        if getattr(settings, 'TEMPLATE_MINIFY', True) and origin.name.endswith('.html'):
+            return minify_html(contents)
+        return contents
+
+
+class MinifyingFilesystemLoader(MinifyMixin, filesystem.Loader):
+    pass
+
+
+class MinifyingAppDirectoriesLoader(MinifyMixin, app_directories.Loader):
+    pass
@@ -1,3 +1,915 @@
-from django.test import TestCase
+import json
+import gzip
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.template import engines
+from django.test import (
+    RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature,
+)
+from django.urls import reverse
+from django.utils import timezone
+from prometheus_client import REGISTRY
+
+from .accounts import from_snapshot, user_key
+from .archive import archive_orders, order_history
+from .catalog import CATALOG_VERSION_KEY, catalog_version, get_products, invalidate_catalog
+from .compression import CompressionMiddleware, brotli
+from .dispatch import build_manifests, transition_orders
+from .models import (
+    Address, ArchivedOrder, Coupon, DispatchManifest, Order, OrderItem,
+    OrderStatusHistory, Product, ProductNeighbor, Review, Subscription,
+)
+from .recommendations import build_recommendations, get_recommendations
+from .template_loaders import minify_html
+from .management.commands.bench_media_urls import CachedFakeRemoteStorage
+from .metrics import MetricsMiddleware, coupon_redeemed
+from .ratelimit import client_ip, hit, parse_rate, ratelimit
+from .reviews import ReviewError, delete_review, submit_review
+from .routers import PIN_COOKIE, PrimaryPinMiddleware, ReplicaRouter, use_primary
+
+
+class RateLimitTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate('5/m'), (5, 60))
+        self.assertEqual(parse_rate('10/5m'), (10, 300))
+
+    def test_bucket_exhausts(self):
+        for _ in range(3):
+            self.assertTrue(hit('t', 'a', '3/m')[0])
+        allowed, retry_after = hit('t', 'a', '3/m')
+        self.assertFalse(allowed)
+        self.assertGreaterEqual(retry_after, 1)
+        # Dusre key ka bucket alag hai
+        self.assertTrue(hit('t', 'b', '3/m')[0])
+
+    def test_no_burst_across_window_boundary(self):
+        boundary = 60 * 29_000_000
+        with mock.patch('core.ratelimit.time.time', return_value=boundary - 0.1):
+            allowed = sum(hit('t', 'edge', '10/m')[0] for _ in range(15))
+        self.assertEqual(allowed, 10)
+        # Fixed window yahan 10 aur de deta — pichhli window abhi bhi count hoti hai
+        with mock.patch('core.ratelimit.time.time', return_value=boundary + 0.1):
+            self.assertFalse(hit('t', 'edge', '10/m')[0])
+        # Pichhli window dheere dheere fade hoti hai
+        with mock.patch('core.ratelimit.time.time', return_value=boundary + 40):
+            self.assertTrue(hit('t', 'edge', '10/m')[0])
+
+    def test_apply_coupon_returns_429(self):
+        url = reverse('apply_coupon')
+        body = json.dumps({'code': 'NOPE', 'subtotal': 100})
+        for _ in range(10):
+            self.client.post(url, body, content_type='application/json')
+        response = self.client.post(url, body, content_type='application/json')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        self.assertFalse(response.json()['success'])
+
+    @override_settings(RATELIMIT_USE_X_FORWARDED_FOR=True, RATELIMIT_TRUSTED_PROXY_COUNT=1)
+    def test_client_ip_ignores_spoofed_forwarded_entries(self):
+        factory = RequestFactory()
+        spoofed = factory.get('/', HTTP_X_FORWARDED_FOR='1.2.3.4, 203.0.113.7', REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(client_ip(spoofed), '203.0.113.7')
+        self.assertEqual(client_ip(factory.get('/', REMOTE_ADDR='10.0.0.1')), '10.0.0.1')
+        with self.settings(RATELIMIT_TRUSTED_PROXY_COUNT=2):
+            self.assertEqual(client_ip(spoofed), '1.2.3.4')
+
+    def test_login_get_not_counted(self):
+        for _ in range(15):
+            self.assertEqual(self.client.get(reverse('login')).status_code, 200)
+
+    def test_overhead_budget(self):
+        view = ratelimit('bench', '1000000/m')(lambda request: None)
+        request = RequestFactory().post('/')
+        n = 2000
+        start = time.perf_counter()
+        for _ in range(n):
+            view(request)
+        per_request = (time.perf_counter() - start) / n
+        # LocMem cache pe ek add/incr — 1ms se kaafi kam hona chahiye
+        self.assertLess(per_request, 0.001)
+
+
+class ImportCatalogTests(TestCase):
+    def write_catalog(self, lines):
+        fd, path = tempfile.mkstemp(suffix='.jsonl')
+        with os.fdopen(fd, 'w') as f:
+            f.write('\n'.join(json.dumps(line) for line in lines))
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_upsert_and_dry_run(self):
+        Product.objects.create(sku='MILK1', name='Old', description='', price='10.00', unit='1 L')
+        self.assertEqual(len(get_products()), 1)
+        path = self.write_catalog([
+            {'sku': 'MILK1', 'name': 'Cow Milk', 'price': '60', 'unit': '1 L'},
+            {'sku': 'GHEE1', 'name': 'Ghee', 'price': '550.5', 'unit': '500 gm'},
+        ])
+
+        out = StringIO()
+        call_command('import_catalog', path, '--dry-run', '--diff', stdout=out)
+        self.assertIn('1 to create, 1 to update', out.getvalue())
+        self.assertEqual(Product.objects.count(), 1)
+
+        call_command('import_catalog', path, stdout=StringIO())
+        self.assertEqual(Product.objects.get(sku='MILK1').name, 'Cow Milk')
+        self.assertEqual(str(Product.objects.get(sku='GHEE1').price), '550.50')
+        # Import ke baad catalog cache invalidate hona chahiye
+        self.assertEqual(len(get_products()), 2)
+
+    def test_reimport_same_images_is_noop(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        with open(os.path.join(media, 'milk.jpeg'), 'wb') as f:
+            f.write(b'milk-image')
+        path = self.write_catalog([{'sku': 'MILK1', 'name': 'Milk', 'price': '60', 'unit': '1 L', 'image': 'milk.jpeg'}])
+
+        with self.settings(MEDIA_ROOT=os.path.join(media, 'media')):
+            for _ in range(2):
+                call_command('import_catalog', path, '--images-dir', media, stdout=StringIO())
+            out = StringIO()
+            call_command('import_catalog', path, '--images-dir', media, '--diff', stdout=out)
+            self.assertIn('0 to create, 0 to update, 1 unchanged, 0 images to upload', out.getvalue())
+            self.assertEqual(len(os.listdir(os.path.join(media, 'media', 'products'))), 1)
+
+            # Content badla toh dobara upload
+            with open(os.path.join(media, 'milk.jpeg'), 'wb') as f:
+                f.write(b'new-milk-image')
+            out = StringIO()
+            call_command('import_catalog', path, '--images-dir', media, '--dry-run', stdout=out)
+            self.assertIn('1 to update, 0 unchanged, 1 images to upload', out.getvalue())
+
+
+class CatalogCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Product.objects.create(name='Milk', description='', price='60.00', unit='1 L')
+
+    def test_evicted_version_does_not_revive_stale_list(self):
+        get_products()
+        stale_key = f'catalog:products:{catalog_version()}'
+        cache.delete(CATALOG_VERSION_KEY)
+        Product.objects.update(price='65.00')
+        invalidate_catalog()
+        self.assertNotEqual(f'catalog:products:{catalog_version()}', stale_key)
+        self.assertEqual(str(get_products()[0].price), '65.00')
+
+    @override_settings(CATALOG_CACHE_TIMEOUT=0)
+    def test_timeout_zero_skips_cache(self):
+        get_products()
+        Product.objects.update(price='65.00')
+        self.assertEqual(str(get_products()[0].price), '65.00')
+
+
+class CheckoutTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('ravi', password='pass12345')
+        self.address = Address.objects.create(
+            user=self.user, full_name='Ravi', phone_number='999', street_address='1 MG Road',
+            city='Pune', state='MH', pincode='411001', is_default=True,
+        )
+        self.milk = Product.objects.create(name='Milk', description='', price='60.00', unit='1 L')
+        Coupon.objects.create(
+            code='FLAT10', discount_type='Fixed', discount_value='10.00',
+            valid_to=timezone.now() + timedelta(days=1), is_affiliate=True,
+        )
+        self.client.force_login(self.user)
+
+    def test_place_order(self):
+        response = self.client.post(reverse('place_order'), json.dumps({
+            'cart': [{'id': self.milk.id, 'quantity': 2}],
+            'address_id': self.address.id,
+            'coupon_code': 'flat10',
+        }), content_type='application/json')
+        self.assertTrue(response.json()['success'])
+
+        order = Order.objects.get(pk=response.json()['order_id'])
+        self.assertEqual(str(order.total_amount), '150.00')
+        self.assertEqual(order.items.count(), 1)
+        coupon = Coupon.objects.get(code='FLAT10')
+        self.assertEqual(coupon.total_uses, 1)
+        self.assertEqual(str(coupon.total_revenue_generated), '150.00')
+
+    def test_missing_product(self):
+        response = self.client.post(reverse('place_order'), json.dumps({
+            'cart': [{'id': 9999, 'quantity': 1}],
+            'address_id': self.address.id,
+        }), content_type='application/json')
+        self.assertEqual(response.json()['message'], 'One or more products not found.')
+
+    def test_cart_page_and_referral(self):
+        self.client.get(reverse('apply_affiliate_coupon', args=['flat10']))
+        response = self.client.get(reverse('cart_page'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('FLAT10', response.context['coupon_data'])
+        self.assertEqual(len(response.context['addresses']), 1)
+
+
+def make_address(user, **kwargs):
+    fields = dict(
+        full_name=user.username, phone_number='999', street_address='1 MG Road',
+        city='Pune', state='MH', pincode='411001',
+    )
+    fields.update(kwargs)
+    return Address.objects.create(user=user, **fields)
+
+
+class DefaultAddressTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('asha', password='pass12345')
+
+    def test_new_default_replaces_old(self):
+        first = make_address(self.user, is_default=True)
+        second = make_address(self.user, is_default=True)
+        first.refresh_from_db()
+        self.assertFalse(first.is_default)
+        self.assertTrue(second.is_default)
+
+    def test_resaving_default_skips_update(self):
+        address = make_address(self.user, is_default=True)
+        address = Address.objects.get(pk=address.pk)
+        with self.assertNumQueries(1):
+            address.save()
+
+    def test_constraint_blocks_two_defaults(self):
+        make_address(self.user, is_default=True)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            # bulk_create save() bypass karta hai — sirf DB constraint bachata hai
+            Address.objects.bulk_create([Address(
+                user=self.user, full_name='x', phone_number='1', street_address='x',
+                city='x', state='x', pincode='1', is_default=True,
+            )])
+
+
+    def test_default_paths_take_user_lock(self):
+        # SQLite pe select_for_update no-op hai — kam se kam dono paths lock lete hain ye check karo
+        with mock.patch.object(Address, '_lock_user') as lock:
+            make_address(self.user, is_default=True)
+            make_address(self.user).make_default()
+            make_address(self.user)
+        self.assertEqual(lock.call_count, 2)
+
+    def test_add_address_view_default(self):
+        make_address(self.user, is_default=True)
+        self.client.force_login(self.user)
+        self.client.post(reverse('add_address'), {
+            'full_name': 'Asha', 'phone_number': '999', 'street_address': '2 FC Road',
+            'city': 'Pune', 'state': 'MH', 'pincode': '411004', 'is_default': 'on',
+        })
+        self.assertEqual(Address.objects.filter(user=self.user, is_default=True).get().street_address, '2 FC Road')
+
+
+# SQLite writers ko waise hi serialise karta hai aur select_for_update ignore
+# karta hai — wahan ye test lock ke bina bhi pass hota, isliye sirf Postgres pe
+def run_parallel(func, args_list):
+    barrier = threading.Barrier(len(args_list))
+    errors = []
+
+    def run(*args):
+        try:
+            barrier.wait()
+            func(*args)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=run, args=args) for args in args_list]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class DefaultAddressConcurrencyTests(TransactionTestCase):
+    def test_parallel_make_default(self):
+        user = User.objects.create_user('meera', password='pass12345')
+        make_address(user, is_default=True)
+        addresses = [make_address(user) for _ in range(4)]
+
+        for _ in range(5):
+            errors = run_parallel(lambda address: address.make_default(), [(a,) for a in addresses])
+            self.assertEqual(errors, [])
+            self.assertEqual(Address.objects.filter(user=user, is_default=True).count(), 1)
+
+    def test_parallel_default_creates(self):
+        user = User.objects.create_user('meera', password='pass12345')
+        make_address(user, is_default=True)
+        errors = run_parallel(
+            lambda city: make_address(user, city=city, is_default=True),
+            [(city,) for city in ['Pune', 'Nashik', 'Nagpur', 'Satara']],
+        )
+        self.assertEqual(errors, [])
+        self.assertEqual(Address.objects.filter(user=user, is_default=True).count(), 1)
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRouterTests(SimpleTestCase):
+    # SimpleTestCase — TestCase khud atomic block mein chalta hai, jahan router primary deta hai
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def test_catalog_reads_go_to_replica(self):
+        self.assertEqual(self.router.db_for_read(Product), 'replica')
+        self.assertEqual(self.router.db_for_read(Order), 'replica')
+        self.assertEqual(self.router.db_for_read(Address), 'default')
+        self.assertEqual(self.router.db_for_write(Product), 'default')
+
+    def test_use_primary(self):
+        with use_primary():
+            self.assertEqual(self.router.db_for_read(Product), 'default')
+        self.assertEqual(self.router.db_for_read(Product), 'replica')
+
+    def test_write_pins_following_reads(self):
+        seen = []
+
+        def view(request):
+            seen.append(self.router.db_for_read(Product))
+            return HttpResponse()
+
+        middleware = PrimaryPinMiddleware(view)
+        factory = RequestFactory()
+        response = middleware(factory.post('/place-order/'))
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+        pinned = factory.get('/')
+        pinned.COOKIES[PIN_COOKIE] = '1'
+        middleware(pinned)
+        middleware(factory.get('/'))
+        self.assertEqual(seen, ['default', 'default', 'replica'])
+
+    async def test_async_write_pins_following_reads(self):
+        seen = []
+
+        async def view(request):
+            seen.append(self.router.db_for_read(Product))
+            return HttpResponse()
+
+        middleware = PrimaryPinMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = await middleware(RequestFactory().post('/place-order/'))
+        self.assertIn(PIN_COOKIE, response.cookies)
+        await middleware(RequestFactory().get('/'))
+        self.assertEqual(seen, ['default', 'replica'])
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas_configured(self):
+        self.assertEqual(self.router.db_for_read(Product), 'default')
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRouterTransactionTests(TransactionTestCase):
+    def test_reads_inside_atomic_use_primary(self):
+        router = ReplicaRouter()
+        self.assertEqual(router.db_for_read(Order), 'replica')
+        with transaction.atomic():
+            self.assertEqual(router.db_for_read(Order), 'default')
+
+    def test_batch_commands_read_primary(self):
+        # 'replica' alias configured nahi hai — koi bhi replica read yahan error deta
+        call_command('build_recommendations', stdout=StringIO())
+        call_command('reconcile_ratings', stdout=StringIO())
+        call_command('generate_daily_orders', stdout=StringIO())
+
+
+class GenerateDailyOrdersTests(TestCase):
+    def test_idempotent_per_date(self):
+        user = User.objects.create_user('kiran', password='pass12345')
+        address = make_address(user, is_default=True)
+        milk = Product.objects.create(name='Milk', description='', price='60.00', unit='1 L')
+        eggs = Product.objects.create(name='Eggs', description='', price='90.00', unit='6 pcs')
+        start = timezone.localdate()
+        Subscription.objects.create(user=user, product=milk, quantity=2, shipping_address=address, start_date=start)
+        Subscription.objects.create(user=user, product=eggs, quantity=1, shipping_address=address, start_date=start)
+        Subscription.objects.create(
+            user=user, product=eggs, quantity=1, shipping_address=address,
+            start_date=start, schedule='Alternate',
+        )
+
+        tomorrow = (start + timedelta(days=1)).isoformat()
+        call_command('generate_daily_orders', '--date', tomorrow, stdout=StringIO())
+        call_command('generate_daily_orders', '--date', tomorrow, stdout=StringIO())
+
+        order = Order.objects.get()
+        self.assertEqual(str(order.subtotal), '210.00')
+        self.assertEqual(str(order.total_amount), '250.00')
+        # Alternate wala kal due nahi hai
+        self.assertEqual(OrderItem.objects.filter(order=order).count(), 2)
+
+    def test_overlapping_run_skips_processed_subscriptions(self):
+        from core.management.commands.generate_daily_orders import Command
+
+        user = User.objects.create_user('kiran', password='pass12345')
+        address = make_address(user, is_default=True)
+        milk = Product.objects.create(name='Milk', description='', price='60.00', unit='1 L')
+        sub = Subscription.objects.create(
+            user=user, product=milk, quantity=2, shipping_address=address, start_date=timezone.localdate(),
+        )
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        # Dono runs ne lock se pehle same pending list padhi
+        chunk = {(user.pk, address.pk): [(sub.pk, milk.pk, 2)]}
+        prices = {milk.pk: Decimal('60.00')}
+
+        self.assertEqual(Command().create_orders(chunk, prices, tomorrow), 1)
+        self.assertEqual(Command().create_orders(chunk, prices, tomorrow), 0)
+        self.assertEqual(Order.objects.count(), 1)
+
+
+class DispatchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.staff = User.objects.create_user('ops', password='pass12345', is_staff=True)
+        milk = Product.objects.create(name='Milk', description='', price='60.00', unit='1 L')
+        self.date = timezone.localdate()
+        for i, pincode in enumerate(['411001', '411001', '411002']):
+            user = User.objects.create_user(f'c{i}', password='pass12345')
+            address = make_address(user, pincode=pincode)
+            order = Order.objects.create(
+                user=user, shipping_address=address, subtotal='60.00',
+                total_amount='100.00', delivery_date=self.date,
+            )
+            OrderItem.objects.create(order=order, product=milk, price='60.00', quantity=1)
+
+    def test_manifests_group_by_pincode(self):
+        self.assertEqual(build_manifests(self.date), 3)
+        self.assertEqual(build_manifests(self.date), 0)
+        counts = {m.pincode: m.orders.count() for m in DispatchManifest.objects.all()}
+        self.assertEqual(counts, {'411001': 2, '411002': 1})
+
+    def test_transition_writes_history(self):
+        self.assertEqual(transition_orders(Order.objects.all(), 'Out for Delivery'), 0)
+        self.assertEqual(transition_orders(Order.objects.all(), 'Processing', user=self.staff), 3)
+        self.assertEqual(transition_orders(Order.objects.all(), 'Out for Delivery'), 3)
+        self.assertEqual(Order.objects.filter(status='Out for Delivery').count(), 3)
+        self.assertEqual(OrderStatusHistory.objects.filter(from_status='Processing').count(), 3)
+        with self.assertRaises(ValueError):
+            transition_orders(Order.objects.all(), 'Pending')
+
+    def test_api_and_route_sheet(self):
+        build_manifests(self.date)
+        self.client.force_login(self.staff)
+        manifest = DispatchManifest.objects.get(pincode='411001')
+        response = self.client.post(reverse('dispatch_transition'), json.dumps({
+            'status': 'Processing', 'manifest_ids': [manifest.id],
+        }), content_type='application/json')
+        self.assertEqual(response.json()['updated'], 2)
+
+        # Session aur user cache se (core.accounts) — sirf ek joined route sheet query
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('route_sheet'), {'manifest': manifest.id})
+            lines = b''.join(response.streaming_content).decode().strip().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertIn('Processing', lines[1])
+
+    def test_route_sheet_escapes_formulas_and_validates_params(self):
+        build_manifests(self.date)
+        self.client.force_login(self.staff)
+        Address.objects.filter(pincode='411002').update(full_name='=HYPERLINK("http://evil")', city='-2+3')
+
+        response = self.client.get(reverse('route_sheet'), {'date': self.date.isoformat()})
+        body = b''.join(response.streaming_content).decode()
+        self.assertIn('"\'=HYPERLINK(""http://evil"")"', body)
+        self.assertIn(",'-2+3,", body)
+
+        for params in [{'manifest': 'abc'}, {'date': '19-10-2026'}, {'slot': 'Night'}]:
+            response = self.client.get(reverse('route_sheet'), params)
+            self.assertEqual(response.status_code, 400)
+
+    def test_admin_change_form_uses_transitions(self):
+        from django.contrib.admin.sites import site
+        from django.forms.models import model_to_dict
+
+        order = Order.objects.first()
+        model_admin = site._registry[Order]
+        request = RequestFactory().post('/')
+        request.user = self.staff
+        Form = model_admin.get_form(request, order)
+        self.assertNotIn('status', Form.base_fields)
+
+        data = {k: v for k, v in model_to_dict(order, fields=Form._meta.fields).items() if v is not None}
+        form = Form(data={**data, 'change_status': 'Delivered'}, instance=order)
+        self.assertFalse(form.is_valid())  # Pending -> Delivered allowed nahi
+
+        form = Form(data={**data, 'change_status': 'Processing'}, instance=order)
+        self.assertTrue(form.is_valid(), form.errors)
+        model_admin.save_model(request, form.save(commit=False), form, True)
+        order.refresh_from_db()
+        self.assertEqual(order.status, 'Processing')
+        history = OrderStatusHistory.objects.get(order=order)
+        self.assertEqual((history.from_status, history.changed_by), ('Pending', self.staff))
+
+
+class ArchiveTests(TestCase):
+    def test_archive_in_batches(self):
+        user = User.objects.create_user('old', password='pass12345')
+        milk = Product.objects.create(name='Milk', description='', price='60.00', unit='1 L')
+        for status in ['Delivered', 'Delivered', 'Cancelled', 'Pending']:
+            order = Order.objects.create(user=user, subtotal='60.00', total_amount='60.00', status=status)
+            OrderItem.objects.create(order=order, product=milk, price='60.00', quantity=1)
+        Order.objects.create(user=user, subtotal='60.00', total_amount='60.00', status='Delivered')
+        old = timezone.now() - timedelta(days=400)
+        Order.objects.exclude(pk=Order.objects.order_by('-id')[0].pk).update(created_at=old)
+
+        self.assertEqual(archive_orders(days=180, batch_size=2, max_batches=1), 2)
+        self.assertEqual(archive_orders(days=180, batch_size=2), 1)
+        self.assertEqual(archive_orders(days=180, batch_size=2), 0)
+
+        self.assertEqual(Order.objects.count(), 2)
+        self.assertEqual(ArchivedOrder.objects.count(), 3)
+        self.assertEqual(ArchivedOrder.objects.first().items.count(), 1)
+        history = list(order_history(user=user))
+        self.assertEqual(len(history), 5)
+        self.assertEqual(sum(row['is_archived'] for row in history), 3)
+
+    @override_settings(DATABASE_REPLICAS=['replica'])
+    def test_archive_reads_primary(self):
+        # 'replica' alias test DB mein hai hi nahi — koi bhi replica read yahan fail hota
+        user = User.objects.create_user('old', password='pass12345')
+        Order.objects.create(user=user, subtotal='60.00', total_amount='60.00', status='Delivered')
+        Order.objects.update(created_at=timezone.now() - timedelta(days=400))
+        self.assertEqual(archive_orders(days=180), 1)
+
+    def test_status_history_moves_with_order(self):
+        user = User.objects.create_user('old', password='pass12345')
+        order = Order.objects.create(user=user, subtotal='60.00', total_amount='60.00')
+        transition_orders(Order.objects.all(), 'Cancelled', user=user)
+        Order.objects.update(created_at=timezone.now() - timedelta(days=400))
+
+        self.assertEqual(archive_orders(days=180), 1)
+        history = OrderStatusHistory.objects.get()
+        self.assertIsNone(history.order_id)
+        self.assertEqual(history.archived_order_id, order.id)
+        self.assertEqual(ArchivedOrder.objects.get().status_history.count(), 1)
+
+
+class CachedMediaURLTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.storage = CachedFakeRemoteStorage(0, location=self.tmp.name, base_url='/media/')
+
+    def test_urls_memoized_per_transformation(self):
+        for _ in range(3):
+            self.assertEqual(self.storage.url('products/a.jpeg'), '/media/products/a.jpeg')
+            self.storage.url('products/a.jpeg', width=200)
+        self.assertEqual(self.storage.calls, 2)
+
+    def test_save_and_delete_invalidate(self):
+        name = self.storage.save('products/b.jpeg', ContentFile(b'x'))
+        self.storage.url(name)
+        self.assertTrue(self.storage.exists(name))
+        self.storage.delete(name)
+        self.assertFalse(self.storage.exists(name))
+        self.storage.url(name)
+        self.assertEqual(self.storage.calls, 2)
+
+    def test_lru_bound(self):
+        self.storage.url_cache.maxsize = 2
+        for name in ['a', 'b', 'c', 'a']:
+            self.storage.url(name)
+        self.assertEqual(self.storage.calls, 4)
+
+
+class MetricsTests(TestCase):
+    def test_metrics_endpoint(self):
+        Product.objects.create(name='Milk', description='', price='60.00', unit='1 L')
+        self.client.get(reverse('login'))
+        self.client.get(reverse('cart_page'))
+
+        body = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn('daillyfresh_view_latency_seconds_count{method="GET",view="login"}', body)
+        self.assertIn('daillyfresh_view_db_queries_bucket{le="0.0",view="login"}', body)
+        self.assertIn('daillyfresh_cache_requests_total', body)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_token_required(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+
+    async def test_async_middleware(self):
+        async def view(request):
+            return HttpResponse()
+
+        middleware = MetricsMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        labels = {'view': '<unresolved>', 'method': 'GET'}
+        before = REGISTRY.get_sample_value('daillyfresh_view_latency_seconds_count', labels) or 0
+        await middleware(RequestFactory().get('/'))
+        self.assertEqual(REGISTRY.get_sample_value('daillyfresh_view_latency_seconds_count', labels), before + 1)
+
+    @override_settings(METRICS_TOKEN=None, METRICS_REQUIRE_TOKEN=True)
+    def test_disabled_without_token_when_required(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 404)
+
+    def test_only_affiliate_codes_labelled(self):
+        coupon_redeemed(Coupon(code='SECRET50', is_affiliate=False))
+        coupon_redeemed(Coupon(code='RAVI10', is_affiliate=True))
+        body = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn('code="RAVI10"', body)
+        self.assertIn('code="other"', body)
+        self.assertNotIn('SECRET50', body)
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class ReviewConcurrencyTests(TransactionTestCase):
+    def test_parallel_first_submits(self):
+        user = User.objects.create_user('neha', password='pass12345')
+        milk = Product.objects.create(name='Milk', description='', price='60.00', unit='1 L')
+        order = Order.objects.create(user=user, subtotal='60.00', total_amount='60.00', status='Delivered')
+        item = OrderItem.objects.create(order=order, product=milk, price='60.00', quantity=1)
+
+        errors = run_parallel(lambda rating: submit_review(user, item.id, rating), [(r,) for r in [1, 2, 3, 4]])
+        self.assertEqual(errors, [])
+        self.assertEqual(Review.objects.filter(order_item=item).count(), 1)
+        milk.refresh_from_db()
+        self.assertEqual(milk.reviews_count, 1)
+
+
+class ReviewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('neha', password='pass12345')
+        self.milk = Product.objects.create(name='Milk', description='', price='60.00', unit='1 L')
+        self.items = []
+        for status in ['Delivered', 'Delivered', 'Pending']:
+            order = Order.objects.create(user=self.user, subtotal='60.00', total_amount='60.00', status=status)
+            self.items.append(OrderItem.objects.create(order=order, product=self.milk, price='60.00', quantity=1))
+
+    def aggregates(self):
+        self.milk.refresh_from_db()
+        return (
+            self.milk.reviews_count, self.milk.rating_sum, str(self.milk.rating),
+            [getattr(self.milk, f'rating_{i}_count') for i in range(1, 6)],
+        )
+
+    def test_insert_edit_delete(self):
+        submit_review(self.user, self.items[0].id, 5)
+        review = submit_review(self.user, self.items[1].id, 2)
+        self.assertEqual(self.aggregates(), (2, 7, '3.50', [0, 1, 0, 0, 1]))
+
+        submit_review(self.user, self.items[1].id, 4, 'Better now')
+        self.assertEqual(self.aggregates(), (2, 9, '4.50', [0, 0, 0, 1, 1]))
+
+        delete_review(self.user, review.id)
+        self.assertEqual(self.aggregates(), (1, 5, '5.00', [0, 0, 0, 0, 1]))
+
+    def test_only_delivered_items(self):
+        with self.assertRaises(ReviewError):
+            submit_review(self.user, self.items[2].id, 5)
+        other = User.objects.create_user('other', password='pass12345')
+        with self.assertRaises(ReviewError):
+            submit_review(other, self.items[0].id, 5)
+
+    def test_reconcile_detects_and_fixes_drift(self):
+        submit_review(self.user, self.items[0].id, 4)
+        Product.objects.filter(pk=self.milk.pk).update(reviews_count=9)
+
+        out = StringIO()
+        call_command('reconcile_ratings', stdout=out)
+        self.assertIn('reviews_count 9 -> 1', out.getvalue())
+        call_command('reconcile_ratings', '--fix', stdout=StringIO())
+        self.assertEqual(self.aggregates(), (1, 4, '4.00', [0, 0, 0, 1, 0]))
+
+    def test_review_survives_archive(self):
+        review = submit_review(self.user, self.items[0].id, 4)
+        Order.objects.update(created_at=timezone.now() - timedelta(days=400))
+        archive_orders(days=180)
+
+        review.refresh_from_db()
+        self.assertIsNone(review.order_item_id)
+        self.assertEqual(review.archived_order_item_id, self.items[0].id)
+        self.assertEqual(self.aggregates(), (1, 4, '4.00', [0, 0, 0, 1, 0]))
+
+        out = StringIO()
+        call_command('reconcile_ratings', stdout=out)
+        self.assertIn('No drift found.', out.getvalue())
+
+    def test_review_endpoint(self):
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('review_submit'), json.dumps({
+            'order_item_id': self.items[0].id, 'rating': 3,
+        }), content_type='application/json')
+        self.assertTrue(response.json()['success'])
+        self.assertEqual(Review.objects.count(), 1)
+
+
+class RecommendationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.milk, self.ghee, self.eggs, self.paneer = [
+            Product.objects.create(name=name, description='', price='50.00', unit='1')
+            for name in ['Milk', 'Ghee', 'Eggs', 'Paneer']
+        ]
+
+    def order(self, *products, status='Delivered', age=timedelta(hours=1)):
+        order = Order.objects.create(subtotal='50.00', total_amount='50.00', status=status)
+        for product in products:
+            OrderItem.objects.create(order=order, product=product, price='50.00', quantity=1)
+        Order.objects.filter(pk=order.pk).update(created_at=timezone.now() - age)
+        return order
+
+    def test_incremental_build_and_lookup(self):
+        self.order(self.milk, self.ghee)
+        self.order(self.milk, self.ghee, self.eggs)
+        self.order(self.milk, self.paneer, status='Cancelled')
+        self.assertEqual(build_recommendations(chunk_size=1), (2, 3))
+        self.assertEqual(get_recommendations([self.milk.id]), [self.ghee, self.eggs])
+
+        # Sirf naye orders process hote hain
+        self.order(self.milk, self.eggs)
+        self.order(self.milk, self.eggs)
+        self.assertEqual(build_recommendations()[0], 2)
+        self.assertEqual(get_recommendations([self.milk.id]), [self.eggs, self.ghee])
+        self.assertEqual(get_recommendations([self.milk.id, self.eggs.id]), [self.ghee])
+
+        # Full rebuild same result deta hai
+        build_recommendations(full=True)
+        self.assertEqual(ProductNeighbor.objects.filter(product=self.milk).count(), 2)
+
+    def test_fresh_orders_wait_for_next_run(self):
+        self.order(self.milk, self.ghee)
+        fresh = self.order(self.milk, self.eggs, age=timedelta(0))
+        self.order(self.milk, self.paneer)
+        self.assertEqual(build_recommendations()[0], 1)
+        # Cursor fresh order ke pehle ruka — settle hone ke baad dono aage wale aate hain
+        Order.objects.filter(pk=fresh.pk).update(created_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(build_recommendations()[0], 2)
+        self.assertEqual(ProductNeighbor.objects.filter(product=self.milk).count(), 3)
+
+    def test_cached_lookup_has_no_queries(self):
+        self.order(self.milk, self.ghee)
+        build_recommendations()
+        self.client.get(reverse('recommendations'), {'ids': self.milk.id})
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('recommendations'), {'ids': self.milk.id})
+        self.assertEqual([p['name'] for p in response.json()['products']], ['Ghee'])
+
+
+class PayloadSizeTests(TestCase):
+    PAGES = ['home', 'cart_page', 'login', 'signup']
+
+    def setUp(self):
+        Product.objects.create(
+            name='Milk', description='Fresh', price='60.00', unit='1 L', image='products/test.jpeg',
+        )
+
+    def test_minify_keeps_script_and_pre(self):
+        source = (
+            '<div>\n    <!-- nav -->\n    <p>Hi</p>\n\n</div>\n'
+            '<script>\n  // <!-- keep -->\n  let a = 1\n</script>\n'
+            '<textarea>\n  keep  me\n</textarea>'
+        )
+        self.assertEqual(minify_html(source), (
+            '<div>\n<p>Hi</p>\n</div>\n'
+            '<script>\n// <!-- keep -->\nlet a = 1\n</script>\n'
+            '<textarea>\n  keep  me\n</textarea>'
+        ))
+
+    @override_settings(COMPRESS_CSRF_PAGES=True)
+    def test_report_payload_sizes(self):
+        rows = []
+        for name in self.PAGES:
+            plain = self.client.get(reverse(name))
+            loader = engines['django'].engine.template_loaders[0]
+            with self.settings(TEMPLATE_MINIFY=False):
+                loader.reset()
+                raw = self.client.get(reverse(name))
+            loader.reset()
+            gz = self.client.get(reverse(name), HTTP_ACCEPT_ENCODING='gzip')
+            br = self.client.get(reverse(name), HTTP_ACCEPT_ENCODING='br, gzip')
+
+            self.assertEqual(gz['Content-Encoding'], 'gzip')
+            # CSRF token har response mein alag masked hota hai — length same rehti hai
+            self.assertEqual(len(gzip.decompress(gz.content)), len(plain.content))
+            self.assertEqual(br['Content-Encoding'], 'br')
+            self.assertLess(len(plain.content), len(raw.content))
+            rows.append((name, len(raw.content), len(plain.content), len(gz.content), len(br.content)))
+
+        sys.stderr.write('\nPayload sizes (bytes): page, raw, minified, gzip, br\n')
+        for row in rows:
+            sys.stderr.write('  {:<10} {:>7} {:>9} {:>6} {:>6}\n'.format(*row))
+
+    def test_csrf_pages_not_compressed_by_default(self):
+        response = self.client.get(reverse('login'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    async def test_async_streaming_compressed(self):
+        async def chunks():
+            for i in range(50):
+                yield f'row {i},Milk,1 L\n'.encode()
+
+        async def view(request):
+            return StreamingHttpResponse(chunks(), content_type='text/csv')
+
+        middleware = CompressionMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        expected = ''.join(f'row {i},Milk,1 L\n' for i in range(50)).encode()
+        encodings = [('gzip', gzip.decompress)]
+        if brotli is not None:
+            encodings.append(('br', brotli.decompress))
+        for encoding, decompress in encodings:
+            response = await middleware(RequestFactory().get('/', HTTP_ACCEPT_ENCODING=encoding))
+            self.assertEqual(response['Content-Encoding'], encoding)
+            body = b''.join([chunk async for chunk in response.streaming_content])
+            self.assertEqual(decompress(body), expected)
+
+
+class AccountCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('meera', password='pass12345')
+        self.address = make_address(self.user, is_default=True)
+        self.client.force_login(self.user)
+
+    def test_cart_page_no_queries_on_cache_hit(self):
+        self.client.get(reverse('cart_page'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('cart_page'))
+        self.assertEqual(response.context['user'], self.user)
+        self.assertEqual(response.context['addresses'], [self.address])
+
+    def test_snapshot_has_no_password_hash(self):
+        self.client.get(reverse('cart_page'))
+        data = cache.get(user_key(self.user.pk))
+        self.assertNotIn('password', data['fields'])
+        self.assertNotIn(self.user.password, repr(data))
+        self.assertEqual(data['auth_hash'], self.user.get_session_auth_hash())
+
+    def test_snapshot_user_password_change_gets_new_hash(self):
+        self.client.get(reverse('cart_page'))
+        user = from_snapshot(cache.get(user_key(self.user.pk)))
+        old_hash = user.get_session_auth_hash()
+        user.set_password('newpass12345')
+        self.assertNotEqual(user.get_session_auth_hash(), old_hash)
+        user.save()
+        self.assertTrue(User.objects.get(pk=self.user.pk).check_password('newpass12345'))
+
+    def test_password_change_logs_out_cached_session(self):
+        self.client.get(reverse('cart_page'))
+        self.user.set_password('newpass12345')
+        self.user.save()
+        response = self.client.get(reverse('cart_page'))
+        self.assertFalse(response.context['user'].is_authenticated)
+
+    def test_address_book_invalidated(self):
+        self.client.get(reverse('cart_page'))
+        second = make_address(self.user, city='Nashik')
+        response = self.client.get(reverse('cart_page'))
+        self.assertEqual(len(response.context['addresses']), 2)
+
+        second.make_default()
+        response = self.client.get(reverse('cart_page'))
+        self.assertEqual(response.context['addresses'][0], second)
+        self.assertTrue(response.context['addresses'][0].is_default)
+
+        second.delete()
+        response = self.client.get(reverse('cart_page'))
+        self.assertEqual(response.context['addresses'], [self.address])
+
+    def test_place_order_rejects_other_users_address(self):
+        other = User.objects.create_user('kabir', password='pass12345')
+        foreign = make_address(other)
+        milk = Product.objects.create(name='Milk', description='', price='60.00', unit='1 L')
+        response = self.client.post(reverse('place_order'), json.dumps({
+            'cart': [{'id': milk.id, 'quantity': 1}],
+            'address_id': foreign.id,
+        }), content_type='application/json')
+        self.assertEqual(response.json()['message'], 'Selected address not found.')
+
+    def test_permissions_cached_and_invalidated(self):
+        from django.contrib.auth import get_user
+        from django.contrib.auth.models import Group, Permission
+
+        group = Group.objects.create(name='dispatch')
+        self.user.groups.add(group)
+        request = RequestFactory().get('/')
+        request.session = self.client.session
+
+        self.assertFalse(get_user(request).has_perm('core.change_order'))
+        with self.assertNumQueries(0):
+            self.assertFalse(get_user(request).has_perm('core.change_order'))
+
+        group.permissions.add(Permission.objects.get(codename='change_order'))
+        self.assertTrue(get_user(request).has_perm('core.change_order'))
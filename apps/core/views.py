@@ -1,20 +1,31 @@
 import json
+from datetime import date
+from asgiref.sync import sync_to_async
+from django.db.models import F
 from django.http import JsonResponse
 from django.shortcuts import render, redirect
 from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
 from django.utils import timezone
 from decimal import Decimal
 
 from .models import *
+from .accounts import aget_address, aget_address_book
+from .catalog import get_products
+from .dispatch import route_sheet_response, transition_orders
+from .metrics import CHECKOUT_FAILURES, ORDERS_PLACED, coupon_redeemed
+from .ratelimit import ratelimit
+from .recommendations import get_recommendations
+from .reviews import ReviewError, delete_review, submit_review
 
 
 # --- Main Home View ---
 def home(request):
     slides = HomeHero.objects.order_by('order')
-    products = Product.objects.all()
+    products = get_products()
     return render(request, 'index.html', {'slides': slides, 'products': products})
 
 
@@ -36,6 +47,8 @@ def signup_view(request):
     return render(request, 'accounts/signup.html', {'form': form})
 
 
+@ratelimit('login', '10/m', key='ip')
+@ratelimit('login-user', '5/m', key=lambda r: r.POST.get('username', '').strip().lower() or None)
 def login_view(request):
     if request.user.is_authenticated:
         return redirect('home')
@@ -68,21 +81,22 @@ def logout_view(request):
 # Cart & Checkout Views
 # ---------------------------------------------------------------
 
-def cart_page(request):
+async def cart_page(request):
     """
     Renders the cart/checkout page.
     Fetches user addresses and applied coupon from session.
     """
+    user = await request.auser()
     addresses = []
-    if request.user.is_authenticated:
-        addresses = Address.objects.filter(user=request.user)
+    if user.is_authenticated:
+        addresses = await aget_address_book(user.pk)
 
-    applied_coupon_code = request.session.get('applied_coupon')
+    applied_coupon_code = await request.session.aget('applied_coupon')
     coupon_data = None
 
     if applied_coupon_code:
         try:
-            coupon = Coupon.objects.get(code=applied_coupon_code)
+            coupon = await Coupon.objects.aget(code=applied_coupon_code)
             if coupon.is_valid:
                 coupon_data = {
                     'code': coupon.code,
@@ -91,13 +105,14 @@ def cart_page(request):
                     'min_order_amount': float(coupon.min_order_amount),
                 }
             else:
-                del request.session['applied_coupon']
+                await request.session.apop('applied_coupon')
         except Coupon.DoesNotExist:
-            del request.session['applied_coupon']
+            await request.session.apop('applied_coupon')
 
     coupon_json = json.dumps(coupon_data) if coupon_data else 'null'
 
-    return render(request, 'cart.html', {
+    # Template rendering sync hai (context processors bhi) — thread mein chalao
+    return await sync_to_async(render)(request, 'cart.html', {
         'addresses': addresses,
         'coupon_data': coupon_json,
     })
@@ -111,7 +126,8 @@ def remove_coupon(request):
     return redirect('cart_page')
 
 
-def apply_coupon(request):
+@ratelimit('coupon', '10/m', key='user_or_ip')
+async def apply_coupon(request):
     """
     Manual coupon code entry ke liye AJAX endpoint.
     Cart page ka Alpine.js fetch() call karega — JSON response milega.
@@ -128,7 +144,7 @@ def apply_coupon(request):
                     'message': 'Please enter a coupon code.'
                 })
 
-            coupon = Coupon.objects.get(code__iexact=code)
+            coupon = await Coupon.objects.aget(code__iexact=code)
 
             if not coupon.is_valid:
                 return JsonResponse({
@@ -142,7 +158,7 @@ def apply_coupon(request):
                     'message': f'Minimum order of Rs.{coupon.min_order_amount:.0f} required to use this coupon.'
                 })
 
-            request.session['applied_coupon'] = coupon.code
+            await request.session.aset('applied_coupon', coupon.code)
 
             return JsonResponse({
                 'success': True,
@@ -200,7 +216,7 @@ def add_address(request):
 
 
 @login_required
-def place_order(request):
+async def place_order(request):
     """
     Alpine.js se JSON data receive karta hai.
     Backend pe securely total calculate karta hai — frontend totals pe
@@ -209,18 +225,22 @@ def place_order(request):
     """
     if request.method == 'POST':
         try:
+            user = await request.auser()
             data = json.loads(request.body)
             cart_items = data.get('cart', [])
             address_id = data.get('address_id')
             coupon_code = data.get('coupon_code')
 
-            shipping_address = Address.objects.get(id=address_id, user=request.user)
+            shipping_address = await aget_address(user.pk, address_id)
 
-            # Backend pe actual subtotal calculate karo (DB prices se)
+            # Backend pe actual subtotal calculate karo (DB prices se) — ek hi query
+            products = await Product.objects.ain_bulk([int(item['id']) for item in cart_items])
             actual_subtotal = Decimal('0.00')
             order_products = []
             for item in cart_items:
-                product = Product.objects.get(id=item['id'])
+                product = products.get(int(item['id']))
+                if product is None:
+                    raise Product.DoesNotExist
                 qty = int(item['quantity'])
                 actual_subtotal += product.price * qty
                 order_products.append((product, qty))
@@ -234,7 +254,7 @@ def place_order(request):
 
             if coupon_code:
                 try:
-                    coupon = Coupon.objects.get(code__iexact=coupon_code)
+                    coupon = await Coupon.objects.aget(code__iexact=coupon_code)
                     if coupon.is_valid and actual_subtotal >= coupon.min_order_amount:
                         applied_coupon = coupon
                         if coupon.discount_type == 'Percentage':
@@ -250,8 +270,8 @@ def place_order(request):
                 total_amount = Decimal('0.00')
 
             # Order create karo
-            order = Order.objects.create(
-                user=request.user,
+            order = await Order.objects.acreate(
+                user=user,
                 shipping_address=shipping_address,
                 subtotal=actual_subtotal,
                 delivery_fee=delivery_fee,
@@ -261,24 +281,25 @@ def place_order(request):
                 status='Pending',
             )
 
-            # Order items
-            for product, qty in order_products:
-                OrderItem.objects.create(
-                    order=order,
-                    product=product,
-                    price=product.price,
-                    quantity=qty,
-                )
+            # Order items — ek bulk insert
+            await OrderItem.objects.abulk_create([
+                OrderItem(order=order, product=product, price=product.price, quantity=qty)
+                for product, qty in order_products
+            ])
 
-            # Coupon stats update
+            # Coupon stats update — F() se, taaki parallel orders count na khoyein
             if applied_coupon:
-                applied_coupon.total_uses += 1
+                stats = {'total_uses': F('total_uses') + 1}
                 if applied_coupon.is_affiliate:
-                    applied_coupon.total_revenue_generated += total_amount
-                applied_coupon.save()
+                    stats['total_revenue_generated'] = F('total_revenue_generated') + total_amount
+                await Coupon.objects.filter(pk=applied_coupon.pk).aupdate(**stats)
 
             # Session cleanup
-            request.session.pop('applied_coupon', None)
+            await request.session.apop('applied_coupon', None)
+
+            ORDERS_PLACED.inc()
+            if applied_coupon:
+                coupon_redeemed(applied_coupon)
 
             return JsonResponse({
                 'success': True,
@@ -287,10 +308,13 @@ def place_order(request):
             })
 
         except Address.DoesNotExist:
+            CHECKOUT_FAILURES.labels('Address.DoesNotExist').inc()
             return JsonResponse({'success': False, 'message': 'Selected address not found.'})
         except Product.DoesNotExist:
+            CHECKOUT_FAILURES.labels('Product.DoesNotExist').inc()
             return JsonResponse({'success': False, 'message': 'One or more products not found.'})
         except Exception as e:
+            CHECKOUT_FAILURES.labels(type(e).__name__).inc()
             return JsonResponse({'success': False, 'message': str(e)})
 
     return JsonResponse({'success': False, 'message': 'Invalid request.'})
@@ -300,16 +324,17 @@ def place_order(request):
 # Affiliate / Promo URL View
 # ---------------------------------------------------------------
 
-def apply_affiliate_coupon(request, code):
+@ratelimit('ref', '20/m', key='ip', methods=None)
+async def apply_affiliate_coupon(request, code):
     """
     URL se coupon auto-apply karta hai (e.g. /ref/RAHUL20/).
     Customer ko manually enter nahi karna padta — direct discount milta hai.
     """
     try:
-        coupon = Coupon.objects.get(code__iexact=code)
+        coupon = await Coupon.objects.aget(code__iexact=code)
 
         if coupon.is_valid:
-            request.session['applied_coupon'] = coupon.code
+            await request.session.aset('applied_coupon', coupon.code)
 
             if coupon.is_affiliate and coupon.affiliate_name:
                 messages.success(
@@ -327,4 +352,120 @@ def apply_affiliate_coupon(request, code):
     except Coupon.DoesNotExist:
         messages.error(request, "Invalid referral link or coupon code.")
 
-    return redirect('home')
\ No newline at end of file
+    return redirect('home')
+
+
+def recommendations(request):
+    """
+    Cart page ek baar call karta hai: /recommendations/?ids=1,2,3
+    'Frequently bought together' products JSON mein.
+    """
+    try:
+        ids = [int(pk) for pk in request.GET.get('ids', '').split(',') if pk.strip()]
+    except ValueError:
+        ids = []
+
+    products = get_recommendations(ids[:50])
+    return JsonResponse({'products': [
+        {
+            'id': product.id,
+            'name': product.name,
+            'price': str(product.price),
+            'unit': product.unit,
+            'image': product.image.url if product.image else '',
+        }
+        for product in products
+    ]})
+
+
+# ---------------------------------------------------------------
+# Reviews
+# ---------------------------------------------------------------
+
+@login_required
+def review_submit(request):
+    """
+    Delivered order item ka review (naya ya edit).
+    Body: {"order_item_id": 12, "rating": 5, "comment": "..."}
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Invalid request method.'})
+
+    try:
+        data = json.loads(request.body)
+        review = submit_review(
+            request.user, data.get('order_item_id'), data.get('rating'),
+            (data.get('comment') or '').strip(),
+        )
+    except ValueError:
+        return JsonResponse({'success': False, 'message': 'Invalid request.'})
+    except ReviewError as e:
+        return JsonResponse({'success': False, 'message': str(e)})
+
+    return JsonResponse({'success': True, 'message': 'Thanks for your review!', 'review_id': review.id})
+
+
+@login_required
+def review_delete(request, review_id):
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Invalid request method.'})
+
+    try:
+        delete_review(request.user, review_id)
+    except ReviewError as e:
+        return JsonResponse({'success': False, 'message': str(e)})
+    return JsonResponse({'success': True, 'message': 'Review deleted.'})
+
+
+# ---------------------------------------------------------------
+# Dispatch (staff only)
+# ---------------------------------------------------------------
+
+@staff_member_required
+def dispatch_transition(request):
+    """
+    Bulk status change API.
+    Body: {"status": "Out for Delivery", "order_ids": [...]} ya {"manifest_ids": [...]}
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Invalid request method.'}, status=405)
+
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'success': False, 'message': 'Invalid JSON.'}, status=400)
+
+    orders = Order.objects.none()
+    if data.get('order_ids'):
+        orders = Order.objects.filter(id__in=data['order_ids'])
+    elif data.get('manifest_ids'):
+        orders = Order.objects.filter(manifest_id__in=data['manifest_ids'])
+
+    try:
+        updated = transition_orders(orders, data.get('status'), user=request.user)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=400)
+
+    return JsonResponse({'success': True, 'updated': updated})
+
+
+@staff_member_required
+def route_sheet(request):
+    """Route sheet CSV — ?manifest=<id> (multiple) ya ?date=YYYY-MM-DD&slot=Morning"""
+    manifests = DispatchManifest.objects.all()
+    if request.GET.getlist('manifest'):
+        try:
+            manifest_ids = [int(value) for value in request.GET.getlist('manifest')]
+        except ValueError:
+            return JsonResponse({'success': False, 'message': 'Invalid manifest id.'}, status=400)
+        manifests = manifests.filter(id__in=manifest_ids)
+    else:
+        try:
+            delivery_date = date.fromisoformat(request.GET['date']) if request.GET.get('date') else timezone.localdate()
+        except ValueError:
+            return JsonResponse({'success': False, 'message': 'date must be YYYY-MM-DD.'}, status=400)
+        slot = request.GET.get('slot', 'Morning')
+        if slot not in dict(DispatchManifest.SLOT_CHOICES):
+            return JsonResponse({'success': False, 'message': 'Invalid slot.'}, status=400)
+        manifests = manifests.filter(delivery_date=delivery_date, slot=slot)
+    return route_sheet_response(manifests)
@@ -21,25 +21,27 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
 
     # Third Party Apps
-    'tailwind',
-    'theme',  
-    'django_browser_reload',
+    'tailwind',  # base.html mein {% tailwind_css %} tag ke liye
+    'theme',
     'core',
     
 ]
 
 MIDDLEWARE = [
+    'core.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'core.routers.PrimaryPinMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
+    # CSRF ke andar: response pe CSRF_COOKIE_NEEDS_UPDATE abhi reset nahi hua hota
+    'core.compression.CompressionMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    # Browser Reload Middleware
-    "django_browser_reload.middleware.BrowserReloadMiddleware",
 ]
+# Dev-only apps/middleware (django_browser_reload) local.py mein add hote hain
 
 ROOT_URLCONF = 'config.urls'
 
@@ -47,8 +49,14 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'], # Global templates folder
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Templates load hote waqt ek baar minify (core.template_loaders), phir cached
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'core.template_loaders.MinifyingFilesystemLoader',
+                    'core.template_loaders.MinifyingAppDirectoriesLoader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -61,6 +69,23 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'config.wsgi.application'
 
+# Read replicas (core.routers) — catalog/coupon/reporting reads replicas pe.
+# DATABASE_REPLICAS mein DATABASES ke aliases; khali ho toh sab 'default' pe.
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+DATABASE_REPLICAS = []
+# Write ke baad kitne seconds tak user ke reads primary pe rahein
+DATABASE_PRIMARY_PIN_SECONDS = 5
+
+# ASGI run mode (optional): cart, coupon, place-order aur referral views async hain
+# aur dono modes mein chalte hain. ASGI ke liye uvicorn install karke:
+#   gunicorn config.asgi:application -k uvicorn.workers.UvicornWorker
+# Note: Django ORM async calls bhi ek hi sync thread pe chalti hain, isliye DB-bound
+# traffic ke liye WSGI sync workers abhi bhi default hain (Procfile). Compare karne ke
+# liye: python manage.py bench_checkout. ASGI mein CONN_MAX_AGE = 0 hi rakho.
+# Apne middlewares (metrics, primary pin, compression) sync + async dono hain;
+# WhiteNoise abhi sync-only hai, toh ASGI mein request ek baar thread hop karti hai.
+ASGI_APPLICATION = 'config.asgi.application'
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -79,14 +104,60 @@ STATIC_URL = 'static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
-STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+# Storages (STATICFILES_STORAGE / DEFAULT_FILE_STORAGE Django 5.1 se hat chuke hain)
+STORAGES = {
+    "default": {"BACKEND": "core.storage.CachedFileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
 
 # Media files (uploaded by admin / users)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# Resolved media URLs per process kitne yaad rakhne hain (core.storage)
+MEDIA_URL_CACHE_SIZE = 2048
 
 # Tailwind Configuration
 TAILWIND_APP_NAME = 'theme'
 INTERNAL_IPS = [
     "127.0.0.1",
-]
\ No newline at end of file
+]
+
+# Home page product list cache (core.catalog), seconds. 0 = caching band.
+CATALOG_CACHE_TIMEOUT = 60 * 15
+
+# build_recommendations itne seconds se naye orders abhi nahi padhta (items ke
+# alag inserts / replica lag settle hone do) — agle run mein aa jaate hain
+RECOMMENDATIONS_SETTLE_SECONDS = 300
+
+# Auth (core.accounts) — user snapshot, permissions aur address book cache mein.
+# Sessions bhi cache se (DB write-through), toh cache hit pe logged-in request
+# pe auth ke liye koi query nahi. 0 = account caching band. QuerySet.update()
+# se badle users (e.g. is_active=False) itne seconds tak purane dikh sakte hain.
+AUTHENTICATION_BACKENDS = ['core.accounts.CachedModelBackend']
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+ACCOUNT_CACHE_TIMEOUT = 60
+
+# HTML minification (compile time) aur response compression (core.compression)
+TEMPLATE_MINIFY = True
+COMPRESS_MIN_SIZE = 1024
+# CSRF token wale pages compress nahi hote (BREACH); True karne se ye bhi compress honge
+COMPRESS_CSRF_PAGES = False
+
+# Metrics (/metrics, Prometheus text format). Multiple gunicorn workers ke liye
+# PROMETHEUS_MULTIPROC_DIR env var ek khaali writable folder pe set karo.
+# METRICS_TOKEN set ho toh scraper ko 'Authorization: Bearer <token>' bhejna hoga.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+# True ho aur token set na ho toh /metrics 404 (production.py mein True)
+METRICS_REQUIRE_TOKEN = False
+
+# Order archival (core.archive) — itne din purane Delivered/Cancelled orders archive honge
+ORDER_ARCHIVE_AFTER_DAYS = 180
+
+# Rate limiting (core.ratelimit) — login, coupon aur referral endpoints
+# Counters default cache mein rehte hain; production mein shared cache
+# (Redis/Memcached) lagao warna har gunicorn worker apna alag count rakhega.
+RATELIMIT_ENABLE = True
+# Proxy (Railway) ke peeche ho toh X-Forwarded-For se client IP lo. Header mein
+# client ke aage kitne trusted proxies apni entry jodte hain — utni right se padhi jaati hai.
+RATELIMIT_USE_X_FORWARDED_FOR = False
+RATELIMIT_TRUSTED_PROXY_COUNT = 1
@@ -5,6 +5,10 @@ DEBUG = True
 
 ALLOWED_HOSTS = ['*']
 
+# Dev-only tooling — production profile mein ye load nahi hote
+INSTALLED_APPS += ['django_browser_reload']
+MIDDLEWARE += ["django_browser_reload.middleware.BrowserReloadMiddleware"]
+
 # Development Database (SQLite)
 DATABASES = {
     'default': {
@@ -12,4 +16,14 @@ DATABASES = {
         'NAME': BASE_DIR / 'db.sqlite3',
     }
 }
+
+# Replica routing locally test karni ho toh: db.sqlite3 ko db_replica.sqlite3
+# mein copy karo aur USE_LOCAL_REPLICA=1 set karo.
+if os.environ.get('USE_LOCAL_REPLICA'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db_replica.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS = ['replica']
 NPM_BIN_PATH = r"C:\nvm4w\nodejs\npm.cmd" 
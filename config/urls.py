@@ -4,8 +4,10 @@ from core.views import (
     home, signup_view, login_view, logout_view,
     cart_page, add_address, place_order,
     apply_affiliate_coupon, remove_coupon,
-    apply_coupon,
+    apply_coupon, dispatch_transition, route_sheet,
+    review_submit, review_delete, recommendations,
 )
+from core.metrics import metrics_view
 from django.conf import settings
 from django.conf.urls.static import static
 
@@ -25,12 +27,24 @@ urlpatterns = [
     path('place-order/', place_order, name='place_order'),
     path('apply-coupon/', apply_coupon, name='apply_coupon'),
     path('remove-coupon/', remove_coupon, name='remove_coupon'),
+    path('recommendations/', recommendations, name='recommendations'),
 
     # Affiliate / Promo URL — freelancer/YouTuber ke liye
     path('ref/<str:code>/', apply_affiliate_coupon, name='apply_affiliate_coupon'),
 
-    path("__reload__/", include("django_browser_reload.urls")),
+    # Reviews
+    path('reviews/submit/', review_submit, name='review_submit'),
+    path('reviews/<int:review_id>/delete/', review_delete, name='review_delete'),
+
+    # Dispatch (staff)
+    path('dispatch/transition/', dispatch_transition, name='dispatch_transition'),
+    path('dispatch/route-sheet/', route_sheet, name='route_sheet'),
+
+    path('metrics', metrics_view, name='metrics'),
 ]
 
+if 'django_browser_reload' in settings.INSTALLED_APPS:
+    urlpatterns += [path("__reload__/", include("django_browser_reload.urls"))]
+
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
@@ -0,0 +1,9 @@
+# Gunicorn isse apne aap load karta hai (working directory se).
+import os
+
+
+def child_exit(server, worker):
+    # Metrics multiprocess mode: band hue worker ki live gauges hatao
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)